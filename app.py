@@ -348,15 +348,19 @@ def open_modal(unused_select_modal):
 # is clicked and the number of play clicks is greater than 0, the interval
 # component is disabled. If the stop button is clicked and the number of stop
 # clicks is greater than 0, the interval component is enabled. If neither button
-# is clicked, the interval component remains unchanged.
+# is clicked, the interval component remains unchanged. When the frames are
+# played in the browser, the interval component is not used.
 app.clientside_callback(
     """
-    function(play_clicks, stop_clicks) {
+    function(play_clicks, stop_clicks, browser_playback, overlay) {
         const triggered = dash_clientside.callback_context.triggered.map(
             t => t.prop_id
             );
         if (triggered.length > 0) {
             if (triggered[0].includes('play-button')) {
+                if (browser_playback.length > 0 && overlay.length === 0) {
+                    return window.dash_clientside.no_update;
+                }
                 if (play_clicks>0){
                     return false;
                 }
@@ -379,6 +383,8 @@ app.clientside_callback(
     Output("interval-component", "disabled"),
     Input("play-button", "n_clicks"),
     Input("stop-button", "n_clicks"),
+    State("browser-playback-switch", "value"),
+    State("overlay-switch", "value"),
 )
 
 get_test_case_view_callbacks(app)
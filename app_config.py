@@ -41,23 +41,76 @@ APP_VERSION = "v10.4"
 
 DATA_PATH = "./data"
 FRAME_CACHE_PATH = "./cache/frame"
+DATASET_PATH = "./cache/dataset"
+PARSED_CACHE_PATH = "./cache/parsed"
 DASH_CACHE_PATH = "./cache/dash"
 THEME = "dbc"
 
+# data files are parsed in chunks to report the loading progress
+LOAD_BLOCK_SIZE = 16 << 20  # bytes of a CSV file per chunk
+# number of data files that are parsed concurrently
+LOAD_WORKERS = os.cpu_count() or 1
+# total size in bytes of the data files being parsed at the same time,
+# `None` for no limit
+LOAD_MEMORY_LIMIT = None
+# total size in bytes of the parsed data files kept in `PARSED_CACHE_PATH`
+PARSED_CACHE_SIZE = 8 << 30
+
+# number of processes that build the figure buffer
+BUFFER_WORKERS = os.cpu_count() or 1
+# number of frames that are buffered by one task of a worker
+BUFFER_CHUNK_SIZE = 10
+# send the raw values with a hover template to the browser instead of the
+# hover text, the traces that a template can't render keep the hover text
+HOVER_TEMPLATE = True
+
+# maximum number of points that are sent to the browser by a figure, the
+# points above are decimated, `None` for no limit
+SCATTER3D_POINT_BUDGET = 500000
+SCATTER2D_POINT_BUDGET = 1000000
+# number of pixels in x and y of the rasterized 2D views
+SCATTER2D_RASTER_SIZE = (400, 300)
+
 EXPIRATION = 172800  # 2 days in seconds
+# seconds after which the claim on computing the shared filter mask is
+# released, in case the job holding it has been cancelled
+FILTER_LOCK_EXPIRE = 60
+# seconds that a view waits for the shared filter mask computed by another
+# view, before it computes the mask itself
+FILTER_LOCK_WAIT = 0.5
+# number of toggled rows that are kept as deltas before they are merged
+# into the visibility bit array
+VISIBLE_DELTA_SIZE = 4096
+# number of filtered frames kept in memory for each session, so the decay
+# frames of the 3D view are filtered only once while stepping the slider
+FRAME_RING_SIZE = 12
+# number of sessions whose filtered frames and filter mask are kept in memory
+FRAME_RING_SESSIONS = 8
+# frames per second of the playback in the browser
+PLAYBACK_FPS = 20
+# number of buffered frames that the browser prefetches ahead of the frame
+# on display during the playback
+PLAYBACK_WINDOW = 40
 CACHE_KEYS = {
     "dataset": "DATASET",
     "frame_list": "FRAME_LIST",
-    "frame_data": "FRAME_DATA",
-    "visible_table": "VIS_TABLE",
+    "frame_index": "FRAME_INDEX",
+    "file_preview": "FILE_PREVIEW",
+    "visible_mask": "VIS_MASK",
+    "visible_delta": "VIS_DELTA",
     "config": "CONFIG",
     "figure_idx": "FIGURE_IDX",
     "figure": "FIGURE",
     "hover": "HOVER",
     "figure_ref": "FIGURE_REF",
     "figure_layout": "FIGURE_LAYOUT",
+    "figure_image": "FIGURE_IMAGE",
     "task_id": "TASK_ID",
     "filter_kwargs": "FILTGER_KWARGS",
+    "filter_mask": "FILTER_MASK",
+    "filter_result": "FILTER_RESULT",
+    "heatmap": "HEATMAP",
+    "zoom_range": "ZOOM_RANGE",
     "selected_data_left": "SELECTED_DATA_LEFT",
     "selected_data_right": "SELECTED_DATA_RIGHT",
 }
@@ -38,6 +38,7 @@ import dash_bootstrap_components as dbc
 import plotly.io as pio
 
 from app_config import APP_TITLE, APP_VERSION, THEME
+from app_config import PLAYBACK_FPS, PLAYBACK_WINDOW
 
 colorscales = [
     "Blackbody",
@@ -431,6 +432,23 @@ view3d_card = dbc.Card(
                                         target="overlay-switch",
                                         placement="top",
                                     ),
+                                    dbc.Checklist(
+                                        options=[
+                                            {
+                                                "label": "Play in the browser",
+                                                "value": True,
+                                            }
+                                        ],
+                                        value=[True],
+                                        id="browser-playback-switch",
+                                        switch=True,
+                                    ),
+                                    dbc.Tooltip(
+                                        "Prefetch the buffered frames and play \
+                                            them in the browser",
+                                        target="browser-playback-switch",
+                                        placement="top",
+                                    ),
                                     dbc.Checklist(
                                         options=[
                                             {
@@ -612,6 +630,10 @@ left2d_card = dbc.Card(
                                         "label": "All frames",
                                         "value": "all",
                                     },
+                                    {
+                                        "label": "All frames (raster)",
+                                        "value": "raster",
+                                    },
                                 ],
                                 value="current",
                                 id="scatter2dl-allframe-switch",
@@ -802,6 +824,10 @@ right2d_card = dbc.Card(
                                         "label": "All frames",
                                         "value": "all",
                                     },
+                                    {
+                                        "label": "All frames (raster)",
+                                        "value": "raster",
+                                    },
                                 ],
                                 value="current",
                                 id="scatter2dr-allframe-switch",
@@ -1338,12 +1364,31 @@ def get_app_layout():
             dcc.Store(id="left-hide-trigger", data=0),
             dcc.Store(id="right-hide-trigger", data=0),
             dcc.Store(id="file-loaded-trigger", data=0),
+            # the first chunks of a file that is still loading
+            dcc.Store(id="file-preview"),
             dcc.Store(id="background-trigger", data=0),
             dcc.Store(id="dummy-background"),
             dcc.Store(id="visible-table-change-trigger", data=0),
             dcc.Store(id="local-case-selection", storage_type="local"),
             dcc.Store(id="local-file-selection", storage_type="local"),
             dcc.Store(id="current-file"),
+            # the frames of the playback in the browser, requested from and
+            # sent by the server
+            dcc.Store(id="playback-request"),
+            dcc.Store(id="playback-frames"),
+            dcc.Store(
+                id="playback-settings",
+                data={"fps": PLAYBACK_FPS, "window": PLAYBACK_WINDOW},
+            ),
+            # the light and dark figure templates, sent once with the page
+            # for the dark mode switch in the browser
+            dcc.Store(
+                id="figure-templates",
+                data={
+                    "plotly": pio.templates["plotly"],
+                    "plotly_dark": pio.templates["plotly_dark"],
+                },
+            ),
             dcc.Download(id="download"),
             modal,
             dbc.Row(
@@ -1481,6 +1526,7 @@ def get_app_layout():
                             ),
                             dbc.Label(
                                 "Loading ...",
+                                id="loading-text",
                                 color="light",
                                 className="text-center mt-3",
                             ),
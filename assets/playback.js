@@ -0,0 +1,214 @@
+/*
+ * Playback of the 3D view in the browser.
+ *
+ * The frames that are buffered on the server are prefetched into a sliding
+ * window ahead of the frame on display, and the frames are advanced locally
+ * with requestAnimationFrame. The server is only asked for more frames when
+ * the window runs low, so the playback speed doesn't depend on the round
+ * trip of every frame.
+ */
+
+const playback = {
+    playing: false,
+    current: 0,
+    displayed: null,
+    numFrames: 1,
+    decay: 0,
+    fps: 20,
+    windowSize: 40,
+    frames: new Map(),
+    nextRequest: 0,
+    requestId: 0,
+    pending: false,
+    retryAt: 0,
+    lastTime: 0,
+
+    // distance from frame `a` forward to frame `b`, the playback loops
+    ahead(a, b) {
+        return (b - a + this.numFrames) % this.numFrames;
+    },
+
+    start(current, numFrames, decay, settings) {
+        this.playing = true;
+        this.current = current;
+        this.displayed = null;
+        this.numFrames = numFrames;
+        this.decay = decay;
+        this.fps = settings.fps;
+        this.windowSize = Math.min(settings.window, numFrames);
+        this.flush();
+        this.lastTime = 0;
+        window.requestAnimationFrame((now) => this.tick(now));
+    },
+
+    stop() {
+        this.playing = false;
+        this.frames.clear();
+        this.pending = false;
+        this.requestId += 1;
+        return this.displayed;
+    },
+
+    // drop the prefetched frames and fetch them again from the current frame
+    flush() {
+        this.frames.clear();
+        this.nextRequest = this.current;
+        this.pending = false;
+        this.retryAt = 0;
+        this.requestId += 1;
+        this.request();
+    },
+
+    request() {
+        if (
+            !this.playing ||
+            this.pending ||
+            this.frames.has(this.nextRequest) ||
+            performance.now() < this.retryAt
+        ) {
+            return;
+        }
+        const count = this.windowSize - this.ahead(this.current, this.nextRequest);
+        if (count < this.windowSize / 2) {
+            return;
+        }
+        this.pending = true;
+        window.dash_clientside.set_props("playback-request", {
+            data: {start: this.nextRequest, count: count, id: this.requestId},
+        });
+    },
+
+    receive(payload) {
+        if (!payload || payload.id !== this.requestId) {
+            return;
+        }
+        this.pending = false;
+        if (payload.frames.length === 0) {
+            // the next frames are not buffered on the server yet
+            this.retryAt = performance.now() + 500;
+            return;
+        }
+        payload.frames.forEach((frame) => this.frames.set(frame.index, frame));
+        const last = payload.frames[payload.frames.length - 1].index;
+        this.nextRequest = (last + 1) % this.numFrames;
+        if (payload.frames.length < payload.count) {
+            this.retryAt = performance.now() + 500;
+        }
+    },
+
+    tick(now) {
+        if (!this.playing) {
+            return;
+        }
+        window.requestAnimationFrame((t) => this.tick(t));
+        this.request();
+
+        if (now - this.lastTime < 1000 / this.fps) {
+            return;
+        }
+        if (!this.frames.has(this.current)) {
+            return;
+        }
+        this.lastTime = now;
+        this.render(this.current);
+        this.displayed = this.current;
+        this.current = (this.current + 1) % this.numFrames;
+
+        // keep the decay frames behind and the window ahead
+        for (const index of this.frames.keys()) {
+            if (
+                this.ahead(index, this.displayed) > this.decay &&
+                this.ahead(this.displayed, index) >= this.windowSize
+            ) {
+                this.frames.delete(index);
+            }
+        }
+    },
+
+    render(index) {
+        const frame = this.frames.get(index);
+        let data = frame.ref.concat(frame.data);
+        // the playback loops, the frames before the first one are the last ones
+        const decay = Math.min(this.decay, this.numFrames - 1);
+        for (let val = 1; val <= decay; val++) {
+            const past = this.frames.get(
+                (index - val + this.numFrames) % this.numFrames
+            );
+            if (past === undefined) {
+                break;
+            }
+            const opacity = 1 - (0.8 * val) / this.decay;
+            data = data.concat(
+                past.data.map((trace) =>
+                    Object.assign({}, trace, {
+                        marker: Object.assign({}, trace.marker, {opacity: opacity}),
+                    })
+                )
+            );
+        }
+        const patch = new window.dash_clientside.Patch();
+        patch.assign(["data"], data);
+        patch.assign(["layout", "images"], frame.images);
+        window.dash_clientside.set_props("scatter3d", {figure: patch.build()});
+    },
+};
+
+window.dash_clientside = window.dash_clientside || {};
+window.dash_clientside.playback = {
+    control: function (
+        unused_play,
+        unused_stop,
+        slider_value,
+        unused_background,
+        browser_playback,
+        overlay,
+        slider_max,
+        decay,
+        settings
+    ) {
+        const triggered = dash_clientside.callback_context.triggered.map(
+            (t) => t.prop_id
+        );
+        if (triggered.length === 0) {
+            return window.dash_clientside.no_update;
+        }
+        const trigger = triggered[0];
+
+        if (trigger.includes("play-button")) {
+            if (
+                browser_playback.length > 0 &&
+                overlay.length === 0 &&
+                !playback.playing
+            ) {
+                playback.start(slider_value, slider_max + 1, decay, settings);
+            }
+        } else if (trigger.includes("stop-button")) {
+            if (playback.playing) {
+                const displayed = playback.stop();
+                // the server renders the frame with its hover
+                if (displayed !== null && displayed !== slider_value) {
+                    window.dash_clientside.set_props("slider-frame", {
+                        value: displayed,
+                    });
+                }
+            }
+        } else if (trigger.includes("slider-frame")) {
+            // the slider has been moved during the playback
+            if (playback.playing) {
+                playback.current = slider_value;
+                playback.flush();
+            }
+        } else if (trigger.includes("background-trigger")) {
+            // the frames are buffered again with new filters
+            if (playback.playing) {
+                playback.flush();
+            }
+        }
+        return window.dash_clientside.no_update;
+    },
+
+    receive: function (payload) {
+        playback.receive(payload);
+        return window.dash_clientside.no_update;
+    },
+};
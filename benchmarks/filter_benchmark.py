@@ -0,0 +1,217 @@
+"""
+
+    Copyright (C) 2019 - PRESENT  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from utils import filter_all, numexpr
+
+
+def filter_all_legacy(
+    data,
+    num_list,
+    num_values,
+    cat_list,
+    cat_values,
+    visible_table=None,
+    visible_list=None,
+):
+    """
+    The previous `filter_all` implementation, kept as the baseline.
+    """
+    for f_idx, f_name in enumerate(num_list):
+        if f_name not in data.columns:
+            continue
+
+        if f_idx == 0:
+            condition = (data[f_name] >= num_values[f_idx][0]) & (
+                data[f_name] <= num_values[f_idx][1]
+            )
+        else:
+            condition = (
+                condition
+                & (data[f_name] >= num_values[f_idx][0])
+                & (data[f_name] <= num_values[f_idx][1])
+            )
+
+    for f_idx, f_name in enumerate(cat_list):
+        if f_name not in data.columns:
+            continue
+
+        if not cat_values[f_idx]:
+            condition = condition & False
+            break
+
+        for val_idx, val in enumerate(cat_values[f_idx]):
+            if val_idx == 0:
+                val_condition = data[f_name] == val
+            else:
+                val_condition = val_condition | (data[f_name] == val)
+
+        condition = condition & val_condition
+
+    if len(visible_list) == 1:
+        condition = condition & (visible_table["_VIS_"] == visible_list[0])
+    elif not visible_list:
+        condition = condition & False
+
+    return data.loc[condition]
+
+
+def make_dataset(rows, seed=0):
+    """
+    Generate a synthetic radar dataset.
+
+    Parameters:
+    - rows (int): The number of rows.
+    - seed (int): The random seed.
+
+    Returns:
+    - tuple: The dataset, the visibility table and the filter arguments.
+    """
+    rng = np.random.default_rng(seed)
+
+    data = pd.DataFrame(
+        {
+            "Frame": np.sort(rng.integers(0, 10000, rows)),
+            "Latitude": rng.normal(0, 20, rows),
+            "Longitude": rng.uniform(0, 100, rows),
+            "Height": rng.normal(0, 2, rows),
+            "Speed": rng.normal(0, 10, rows),
+            "Sensor": rng.choice(["FL", "FR", "RL", "RR", "F"], rows),
+            "Target": rng.choice(["Car", "Truck", "Pedestrian", "Unknown"], rows),
+        }
+    )
+
+    visible_table = pd.DataFrame()
+    visible_table["_IDS_"] = data.index
+    visible_table["_VIS_"] = "visible"
+    visible_table.loc[rng.integers(0, rows, rows // 100), "_VIS_"] = "hidden"
+
+    filter_args = {
+        "num_list": ["Frame", "Latitude", "Longitude", "Height", "Speed"],
+        "num_values": [[100, 9000], [-30, 30], [5, 95], [-3, 3], [-20, 20]],
+        "cat_list": ["Sensor", "Target"],
+        "cat_values": [["FL", "FR", "F"], ["Car", "Truck", "Unknown"]],
+        "visible_table": visible_table,
+        "visible_list": ["visible"],
+    }
+
+    return data, filter_args
+
+
+def best_of(func, repeat, *args, **kwargs):
+    """
+    Run a function several times and return the best time and the result.
+    """
+    timing = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        timing.append(time.perf_counter() - start)
+
+    return min(timing), result
+
+
+def main():
+    """
+    Compare `filter_all` with the previous implementation.
+    """
+    parser = argparse.ArgumentParser(description="filter_all benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    data, filter_args = make_dataset(args.rows)
+
+    # the app keeps the visibility as a boolean mask instead of a table
+    new_args = dict(filter_args)
+    visible_table = new_args.pop("visible_table")
+    new_args["visible_mask"] = (visible_table["_VIS_"] == "visible").to_numpy()
+
+    legacy_time, legacy = best_of(filter_all_legacy, args.repeat, data, **filter_args)
+    new_time, new = best_of(filter_all, args.repeat, data, **new_args)
+
+    pd.testing.assert_frame_equal(legacy, new)
+
+    print("rows:", args.rows, "| kept:", len(new.index))
+    print("numexpr:", "enabled" if numexpr is not None else "not installed")
+    print("single call")
+    print("  legacy filter_all: {:.3f} s".format(legacy_time))
+    print("  new filter_all:    {:.3f} s".format(new_time))
+    print("  speedup:           {:.1f}x".format(legacy_time / new_time))
+
+    # the frame buffer used to filter every frame on its own, it now
+    # filters the frames once and slices them from the result, the mask
+    # shared by the sessions in the app is not part of this benchmark
+    frames = [frame for _, frame in data.groupby("Frame")][: args.frames]
+
+    # every frame is filtered with the visibility of its own rows only,
+    # sliced before timing so the legacy path doesn't align the full table
+    frame_args = [
+        {**filter_args, "visible_table": visible_table.loc[frame.index]}
+        for frame in frames
+    ]
+
+    def legacy_frames():
+        return [
+            filter_all_legacy(frame, **f_args)
+            for frame, f_args in zip(frames, frame_args)
+        ]
+
+    def new_frames():
+        filtered = filter_all(pd.concat(frames), **new_args)
+        indices = filtered.groupby("Frame").indices
+        return [
+            filtered.iloc[indices.get(frame["Frame"].iloc[0], [])] for frame in frames
+        ]
+
+    legacy_time, legacy = best_of(legacy_frames, 1)
+    new_time, new = best_of(new_frames, 1)
+
+    for legacy_frame, new_frame in zip(legacy, new):
+        pd.testing.assert_frame_equal(legacy_frame, new_frame)
+
+    print("frame buffer (" + str(len(frames)) + " frames)")
+    print("  legacy, filter per frame: {:.3f} s".format(legacy_time))
+    print("  new, filter once, slice:  {:.3f} s".format(new_time))
+    print("  speedup:                  {:.1f}x".format(legacy_time / new_time))
+
+
+if __name__ == "__main__":
+    main()
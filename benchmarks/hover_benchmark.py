@@ -0,0 +1,178 @@
+"""
+
+    Copyright (C) 2019 - PRESENT  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from viz.graph_data import get_hover_strings
+
+
+def get_hover_strings_legacy(data_frame, c_key, c_type, hover):
+    """
+    The previous `get_hover_strings` implementation, kept as the baseline.
+    """
+    hover_str_list = []
+    if hover is None:
+        return hover_str_list
+
+    if c_type == "numerical":
+        frame_list = [data_frame]
+    else:
+        frame_list = [
+            data_frame[data_frame[c_key] == c_item]
+            for c_item in pd.unique(data_frame[c_key])
+        ]
+
+    for new_list in frame_list:
+        hover_str = np.full(len(new_list.index), "", dtype=object)
+        for _, key in enumerate(hover):
+            if key not in new_list.columns:
+                continue
+
+            if "format" in hover[key]:
+                values = new_list[key].map(hover[key]["format"].format)
+            elif "decimal" in hover[key]:
+                format_str = "{:,." + str(hover[key]["decimal"]) + "f}"
+                values = new_list[key].map(format_str.format)
+            else:
+                values = new_list[key].apply(str)
+
+            hover_str = hover_str + hover[key]["description"] + ": " + values + "<br>"
+        hover_str_list.append(hover_str)
+
+    return hover_str_list
+
+
+def make_dataset(rows, seed=0):
+    """
+    Generate a synthetic radar dataset with 15 hover keys.
+
+    Parameters:
+    - rows (int): The number of rows.
+    - seed (int): The random seed.
+
+    Returns:
+    - tuple: The dataset and the hover dictionary.
+    """
+    rng = np.random.default_rng(seed)
+
+    data = pd.DataFrame(
+        {
+            "Frame": np.sort(rng.integers(0, 10000, rows)),
+            "Time": np.sort(rng.uniform(0, 1000, rows)),
+            "Latitude": rng.normal(0, 20, rows),
+            "Longitude": rng.uniform(0, 100, rows),
+            "Height": rng.normal(0, 2, rows),
+            "Range": rng.uniform(0, 250, rows),
+            "Azimuth": rng.uniform(-90, 90, rows),
+            "Elevation": rng.uniform(-15, 15, rows),
+            "Speed": rng.normal(0, 10, rows),
+            "RCS": np.round(rng.normal(0, 10, rows), 1),
+            "SNR": rng.integers(0, 60, rows),
+            "Distance": rng.uniform(0, 5000, rows),
+            "Track": rng.integers(0, 100000, rows),
+            "Sensor": rng.choice(["FL", "FR", "RL", "RR", "F"], rows),
+            "Target": rng.choice(["Car", "Truck", "Pedestrian", "Unknown"], rows),
+        }
+    )
+
+    hover = {
+        "Frame": {"description": "Frame"},
+        "Time": {"description": "Time (s)", "decimal": 3},
+        "Latitude": {"description": "Latitude (m)", "decimal": 2},
+        "Longitude": {"description": "Longitude (m)", "decimal": 2},
+        "Height": {"description": "Height (m)", "decimal": 2},
+        "Range": {"description": "Range (m)", "format": "{:.2f}"},
+        "Azimuth": {"description": "Azimuth (deg)", "format": "{:.1f}"},
+        "Elevation": {"description": "Elevation (deg)", "format": "{:.1f}"},
+        "Speed": {"description": "Speed (m/s)", "decimal": 2},
+        "RCS": {"description": "RCS (dBsm)"},
+        "SNR": {"description": "SNR (dB)"},
+        "Distance": {"description": "Distance (m)", "format": "{:,.1f}"},
+        "Track": {"description": "Track ID"},
+        "Sensor": {"description": "Sensor"},
+        "Target": {"description": "Target"},
+    }
+
+    return data, hover
+
+
+def best_of(func, repeat, *args, **kwargs):
+    """
+    Run a function several times and return the best time and the result.
+    """
+    timing = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        timing.append(time.perf_counter() - start)
+
+    return min(timing), result
+
+
+def main():
+    """
+    Compare `get_hover_strings` with the previous implementation.
+    """
+    parser = argparse.ArgumentParser(description="get_hover_strings benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data, hover = make_dataset(args.rows)
+
+    print("rows:", args.rows, "| keys:", len(hover))
+    for c_key, c_type in [("Speed", "numerical"), ("Sensor", "categorical")]:
+        legacy_time, legacy = best_of(
+            get_hover_strings_legacy, args.repeat, data, c_key, c_type, hover
+        )
+        new_time, new = best_of(
+            get_hover_strings, args.repeat, data, c_key, c_type, hover
+        )
+
+        assert len(legacy) == len(new)
+        for legacy_str, new_str in zip(legacy, new):
+            assert list(legacy_str) == list(new_str)
+
+        print(c_type + " color")
+        print("  legacy get_hover_strings: {:.3f} s".format(legacy_time))
+        print("  new get_hover_strings:    {:.3f} s".format(new_time))
+        print("  speedup:                  {:.1f}x".format(legacy_time / new_time))
+
+
+if __name__ == "__main__":
+    main()
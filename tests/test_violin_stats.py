@@ -0,0 +1,70 @@
+"""
+
+    Copyright (C) 2019 - PRESENT  Zhengyu Peng
+    E-mail: zpeng.me@gmail.com
+    Website: https://zpeng.me
+
+    `                      `
+    -:.                  -#:
+    -//:.              -###:
+    -////:.          -#####:
+    -/:.://:.      -###++##:
+    ..   `://:-  -###+. :##:
+           `:/+####+.   :##:
+    .::::::::/+###.     :##:
+    .////-----+##:    `:###:
+     `-//:.   :##:  `:###/.
+       `-//:. :##:`:###/.
+         `-//:+######/.
+           `-/+####/.
+             `+##+.
+              :##:
+              :##:
+              :##:
+              :##:
+              :##:
+               .+:
+
+"""
+
+import numpy as np
+import pandas as pd
+
+from viz.graph_data import get_violin_stats
+from viz.viz import get_violin
+
+
+def test_single_value_group():
+    """
+    A group with a single value, or a constant one, keeps its outline and
+    its box at the value.
+    """
+    values = np.array([7.0, 3.0, 3.0, 3.0, 1.0, 2.0, 5.0])
+    group = np.array([0, 1, 1, 1, 2, 2, 2])
+
+    stats = get_violin_stats(values, group, 3)
+
+    for g_idx, value in ((0, 7.0), (1, 3.0)):
+        assert np.all(stats["grid"][g_idx] == value)
+        for name in ("q1", "median", "q3", "lowerfence", "upperfence"):
+            assert stats[name][g_idx] == value
+        assert np.max(stats["density"][g_idx]) > 0
+
+    # the other groups still span their values
+    assert stats["grid"][2][0] > 1.0
+    assert stats["grid"][2][-1] < 5.0
+    assert 1.0 <= stats["median"][2] <= 5.0
+
+
+def test_empty_data():
+    """
+    Data without any row, e.g. when every row has been filtered out, gives
+    an empty figure, with or without a color key.
+    """
+    data = pd.DataFrame({"c": pd.Series([], dtype=object), "y": []})
+
+    for c_key in ("c", None):
+        fig = get_violin(data, "c", "y", c_key)
+
+        assert fig["data"] == []
+        assert fig["layout"]["xaxis"]["ticktext"] == []
@@ -29,13 +29,48 @@
 
 import os
 import json
+import uuid
+import time
+import hashlib
 
 import base64
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import wait, FIRST_COMPLETED
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
 
-from app_config import EXPIRATION, KEY_TYPES
-from app_config import frame_cache
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+from app_config import EXPIRATION, KEY_TYPES, CACHE_KEYS, DATASET_PATH
+from app_config import LOAD_BLOCK_SIZE, LOAD_WORKERS, LOAD_MEMORY_LIMIT
+from app_config import PARSED_CACHE_PATH, PARSED_CACHE_SIZE
+from app_config import frame_cache, FILTER_LOCK_EXPIRE, FILTER_LOCK_WAIT
+from app_config import VISIBLE_DELTA_SIZE
+from app_config import FRAME_RING_SIZE, FRAME_RING_SESSIONS
+
+from viz.graph_data import get_hover_text
+
+# memory-mapped Arrow tables opened by this process, keyed by file path
+_dataset_handles = {}
+
+# filtered frames of this process, keyed by session id, the least recently
+# used sessions are dropped
+_frame_rings = OrderedDict()
+_frame_rings_lock = threading.Lock()
+
+# unpacked filter masks of this process, keyed by session id, the least
+# recently used sessions are dropped
+_filter_masks = OrderedDict()
+_filter_masks_lock = threading.Lock()
 
 
 def load_config(json_file):
@@ -64,37 +99,485 @@ def save_config(json_dict, json_file):
         json.dump(json_dict, write_file, indent=4)
 
 
-def load_data(file_list, file=None):
+def read_csv_file(file_path, progress_callback=None, batch_callback=None):
+    """
+    Read a CSV file into an Arrow table chunk by chunk.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - progress_callback (function, optional): Called with the fraction of
+        the file that has been read. Defaults to None.
+    - batch_callback (function, optional): Called with every record batch
+        as soon as it has been read. Defaults to None.
+
+    Returns:
+    - pa.Table: The loaded data.
+    """
+    file_size = max(os.path.getsize(file_path), 1)
+    batch_list = []
+    try:
+        with open(file_path, "rb") as csv_file:
+            reader = pa_csv.open_csv(
+                csv_file, read_options=pa_csv.ReadOptions(block_size=LOAD_BLOCK_SIZE)
+            )
+            for batch in reader:
+                batch_list.append(batch)
+                if batch_callback is not None:
+                    batch_callback(batch)
+                if progress_callback is not None:
+                    progress_callback(min(csv_file.tell() / file_size, 1))
+
+            schema = reader.schema
+    except pa.ArrowInvalid:
+        # the column types are inferred from the first chunk, fall back to
+        # parse the whole file at once if a later chunk doesn't fit
+        return pa.Table.from_pandas(pd.read_csv(file_path), preserve_index=False)
+
+    return pa.Table.from_batches(batch_list, schema=schema)
+
+
+def read_pickle_file(file_path):
+    """
+    Read a Pickle file into an Arrow table.
+
+    Parameters:
+    - file_path (str): The path to the Pickle file.
+
+    Returns:
+    - pa.Table: The loaded data.
+    """
+    data = pd.read_pickle(file_path)
+    try:
+        return pa.Table.from_pandas(data, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # object columns with mixed types can't be converted, fall back to
+        # convert them to strings, the missing values are kept
+        for item in data.columns:
+            if data[item].dtype != object:
+                continue
+            try:
+                pa.array(data[item])
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                data[item] = data[item].where(data[item].isna(), data[item].astype(str))
+
+        return pa.Table.from_pandas(data, preserve_index=False)
+
+
+def get_parsed_file_key(file_path, config=None):
+    """
+    Get the key of a data file in the parsed-file cache.
+
+    The key changes whenever the file (path, size or modification time) or
+    the configuration of the test case changes.
+
+    Parameters:
+    - file_path (str): The path to the data file.
+    - config (dict, optional): The configuration of the test case.
+        Defaults to None.
+
+    Returns:
+    - str: The cache key.
+    """
+    stat = os.stat(file_path)
+    key = [
+        os.path.abspath(file_path),
+        stat.st_size,
+        stat.st_mtime_ns,
+        json.dumps(config, sort_keys=True),
+    ]
+    return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+
+
+def load_parsed_file(file_key):
+    """
+    Load a parsed data file from the parsed-file cache.
+
+    Parameters:
+    - file_key (str): The cache key, see `get_parsed_file_key`.
+
+    Returns:
+    - pa.Table: The memory-mapped table, or None if the file is not cached.
+    """
+    path = os.path.join(PARSED_CACHE_PATH, file_key + ".feather")
+    try:
+        table = feather.read_table(path, memory_map=True)
+        # the modification time is used as the last access time for eviction
+        os.utime(path)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    return table
+
+
+def save_parsed_file(table, file_key):
+    """
+    Save a parsed data file into the parsed-file cache.
+
+    The least recently used files are evicted once the cache grows beyond
+    `PARSED_CACHE_SIZE` bytes.
+
+    Parameters:
+    - table (pa.Table): The parsed data.
+    - file_key (str): The cache key, see `get_parsed_file_key`.
+    """
+    os.makedirs(PARSED_CACHE_PATH, exist_ok=True)
+
+    # write to a temporary file first, so that other sessions never see a
+    # partially written file
+    path = os.path.join(PARSED_CACHE_PATH, file_key + ".feather")
+    tmp_path = path + "." + uuid.uuid4().hex + ".tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+    cached_files = []
+    for entry in os.scandir(PARSED_CACHE_PATH):
+        if entry.name.endswith(".feather"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            cached_files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(f_size for _, f_size, _ in cached_files)
+    for _, f_size, f_path in sorted(cached_files):
+        if total_size <= PARSED_CACHE_SIZE:
+            break
+        if f_path == path:
+            continue
+
+        try:
+            os.remove(f_path)
+        except OSError:
+            pass
+        total_size -= f_size
+
+
+def load_data(
+    file_list, file=None, progress_callback=None, config=None, preview_callback=None
+):
     """
     Load data from file(s).
 
+    The files are parsed concurrently, CSV files in a thread pool (the
+    Arrow reader releases the GIL) and Pickle files in a process pool. The
+    parsed tables are concatenated without copying the columns.
+
+    Parsed files are kept in the parsed-file cache, a file that has been
+    opened before is memory-mapped from there instead of being parsed.
+
     Parameters:
-    - file (str): The selected file.
     - file_list (list): The list of selected files.
+    - file (str, optional): The selected file. Defaults to None.
+    - progress_callback (function, optional): Called with the fraction of
+        the data that has been loaded. Defaults to None.
+    - config (dict, optional): The configuration of the test case, part of
+        the parsed-file cache key. Defaults to None.
+    - preview_callback (function, optional): Called once with the data
+        loaded so far (pa.Table), the first chunks of the files that are
+        still being read included, while the rest is still loading.
+        Defaults to None.
 
     Returns:
-    - pd.DataFrame: The loaded data.
+    - pa.Table: The loaded data.
     """
     if file is not None and file not in file_list:
         file_list.append(file)
 
-    data_list = []
-    for _, f_dict in enumerate(file_list):
-        file = json.loads(f_dict)
+    path_list = []
+    for f_dict in file_list:
+        f_info = json.loads(f_dict)
+        if f_info["name"].endswith((".csv", ".pkl")):
+            path_list.append(os.path.join(f_info["path"], f_info["name"]))
+
+    size_list = [max(os.path.getsize(f_path), 1) for f_path in path_list]
+    fraction_list = [0] * len(path_list)
+    table_list = [None] * len(path_list)
+    batch_lists = [[] for _ in path_list]
+
+    key_list = [get_parsed_file_key(f_path, config) for f_path in path_list]
+    pending = []
+    for f_idx, f_key in enumerate(key_list):
+        table_list[f_idx] = load_parsed_file(f_key)
+        if table_list[f_idx] is None:
+            pending.append(f_idx)
+        else:
+            fraction_list[f_idx] = 1
+
+    def set_fraction(f_idx):
+        return lambda fraction: fraction_list.__setitem__(f_idx, fraction)
+
+    num_pickles = sum(path_list[f_idx].endswith(".pkl") for f_idx in pending)
+    thread_pool = ThreadPoolExecutor(max_workers=LOAD_WORKERS)
+    if num_pickles > 1 and LOAD_WORKERS > 1:
+        process_pool = ProcessPoolExecutor(max_workers=min(LOAD_WORKERS, num_pickles))
+    else:
+        # not worth starting the processes for a single file
+        process_pool = thread_pool
 
-        if file["name"].endswith(".pkl"):
-            new_data = pd.read_pickle(os.path.join(file["path"], file["name"]))
-            # new_data = new_data.reset_index(drop=True)
+    try:
+        running = {}
+        running_size = 0
+        while pending or running:
+            # start as many files as the memory limit allows, at least one
+            while pending and (
+                not running
+                or LOAD_MEMORY_LIMIT is None
+                or running_size + size_list[pending[0]] <= LOAD_MEMORY_LIMIT
+            ):
+                f_idx = pending.pop(0)
+                if path_list[f_idx].endswith(".pkl"):
+                    future = process_pool.submit(read_pickle_file, path_list[f_idx])
+                else:
+                    future = thread_pool.submit(
+                        read_csv_file,
+                        path_list[f_idx],
+                        set_fraction(f_idx),
+                        batch_lists[f_idx].append,
+                    )
+                running[future] = f_idx
+                running_size += size_list[f_idx]
+
+            done, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                f_idx = running.pop(future)
+                table_list[f_idx] = future.result()
+                fraction_list[f_idx] = 1
+                save_parsed_file(table_list[f_idx], key_list[f_idx])
+                running_size -= size_list[f_idx]
+
+            if progress_callback is not None:
+                progress_callback(
+                    sum(
+                        fraction * f_size
+                        for fraction, f_size in zip(fraction_list, size_list)
+                    )
+                    / sum(size_list)
+                )
+
+            if preview_callback is not None and (pending or running):
+                loaded = [table for table in table_list if table is not None]
+                for f_idx in running.values():
+                    if batch_lists[f_idx]:
+                        loaded.append(pa.Table.from_batches(list(batch_lists[f_idx])))
+                if loaded:
+                    preview_callback(
+                        pa.concat_tables(loaded, promote_options="permissive")
+                    )
+                    preview_callback = None
+    finally:
+        thread_pool.shutdown(cancel_futures=True)
+        process_pool.shutdown(cancel_futures=True)
+
+    return pa.concat_tables(table_list, promote_options="permissive")
+
+
+def save_dataset(data, session_id):
+    """
+    Save the dataset of a session into the columnar store.
+
+    The data is written once as an uncompressed Arrow (Feather) file, so
+    that every callback can memory-map it instead of re-parsing the raw
+    data files.
+
+    Parameters:
+    - data (pd.DataFrame or pa.Table): The dataset to be saved.
+    - session_id (str): Session id.
+    """
+    os.makedirs(DATASET_PATH, exist_ok=True)
+
+    old_record = cache_get(session_id, CACHE_KEYS["dataset"])
+
+    # a new file name for every dataset, the old file may still be
+    # memory-mapped by another callback
+    version = uuid.uuid4().hex
+    path = os.path.join(DATASET_PATH, session_id + "_" + version + ".feather")
+    feather.write_feather(data, path, compression="uncompressed")
+
+    cache_set({"path": path, "version": version}, session_id, CACHE_KEYS["dataset"])
+
+    if old_record is not None:
+        # remove the old dataset and the files derived from it
+        old_prefix = session_id + "_" + old_record["version"]
+        for name in os.listdir(DATASET_PATH):
+            if not name.startswith(old_prefix):
+                continue
+
+            old_path = os.path.join(DATASET_PATH, name)
+            _dataset_handles.pop(old_path, None)
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def get_dataset_table(session_id):
+    """
+    Get the memory-mapped Arrow table of the dataset of a session.
 
-        elif file["name"].endswith(".csv"):
-            new_data = pd.read_csv(
-                os.path.join(file["path"], file["name"]), engine="pyarrow"
+    Parameters:
+    - session_id (str): Session id.
+
+    Returns:
+    - pa.Table: The dataset table, or None if no dataset has been saved.
+    """
+    record = cache_get(session_id, CACHE_KEYS["dataset"])
+    if record is None:
+        return None
+
+    table = _dataset_handles.get(record["path"])
+    if table is None:
+        # release the handles and the filtered frames of the previous
+        # datasets of this session
+        for path in list(_dataset_handles):
+            if os.path.basename(path).startswith(session_id + "_"):
+                del _dataset_handles[path]
+                drop_filtered_frames(session_id)
+
+        table = feather.read_table(record["path"], memory_map=True)
+        _dataset_handles[record["path"]] = table
+
+    return table
+
+
+def load_dataset(session_id):
+    """
+    Load the dataset of a session from the columnar store.
+
+    Parameters:
+    - session_id (str): Session id.
+
+    Returns:
+    - pd.DataFrame: The dataset, or None if no dataset has been saved.
+    """
+    table = get_dataset_table(session_id)
+    if table is None:
+        return None
+
+    return table.to_pandas(split_blocks=True)
+
+
+def load_dataset_column(session_id, key):
+    """
+    Load a single column of the dataset of a session from the columnar store.
+
+    Parameters:
+    - session_id (str): Session id.
+    - key (str): The column name.
+
+    Returns:
+    - pd.Series: The column, or None if the column does not exist.
+    """
+    table = get_dataset_table(session_id)
+    if table is None or key not in table.column_names:
+        return None
+
+    return table.column(key).to_pandas()
+
+
+def get_hover_table(session_id, hover):
+    """
+    Get the memory-mapped table of the hover text of the dataset of a
+    session.
+
+    The hover text of the whole dataset is formatted once and saved next to
+    the dataset, so that the frames only need to look it up.
+
+    Parameters:
+    - session_id (str): Session id.
+    - hover (dict): The dictionary specifying the hover descriptions and formats.
+
+    Returns:
+    - pa.Table: The table with the `hover` column, or None if no dataset
+        has been saved.
+    """
+    table = get_dataset_table(session_id)
+    if table is None:
+        return None
+
+    record = cache_get(session_id, CACHE_KEYS["dataset"])
+    hover_hash = hashlib.sha1(json.dumps(hover, sort_keys=True).encode()).hexdigest()
+    path = os.path.join(
+        DATASET_PATH,
+        session_id + "_" + record["version"] + "_hover_" + hover_hash + ".feather",
+    )
+
+    hover_table = _dataset_handles.get(path)
+    if hover_table is None:
+        if not os.path.exists(path):
+            columns = [key for key in hover if key in table.column_names]
+            hover_text = get_hover_text(table.select(columns).to_pandas(), hover)
+
+            # write to a temporary file first, the buffer workers may read
+            # the hover text at the same time
+            tmp_path = path + "." + uuid.uuid4().hex + ".tmp"
+            feather.write_feather(
+                pa.table({"hover": pa.array(hover_text, pa.string())}),
+                tmp_path,
+                compression="uncompressed",
             )
+            os.replace(tmp_path, path)
+
+        hover_table = feather.read_table(path, memory_map=True)
+        _dataset_handles[path] = hover_table
 
-        data_list.append(new_data)
+    return hover_table
 
-    data = pd.concat(data_list)
-    return data.reset_index(drop=True)
+
+def load_hover_text(session_id, hover, row_ids):
+    """
+    Load the hover text of some rows of the dataset of a session.
+
+    Parameters:
+    - session_id (str): Session id.
+    - hover (dict): The dictionary specifying the hover descriptions and formats.
+    - row_ids (np.ndarray): The row ids.
+
+    Returns:
+    - np.ndarray: The hover text of the rows.
+    """
+    hover_column = get_hover_table(session_id, hover).column("hover")
+    return hover_column.take(pa.array(row_ids)).to_numpy(zero_copy_only=False)
+
+
+def load_frame(session_id, frame_idx):
+    """
+    Load the data of a single frame from the columnar store.
+
+    The dataset is sorted by frame, so a frame is a contiguous slice of the
+    table, located with the frame index that is saved when the file is
+    loaded.
+
+    Parameters:
+    - session_id (str): Session id.
+    - frame_idx (int): The index of the frame in the frame list.
+
+    Returns:
+    - pd.DataFrame: The data of the frame, indexed by the row ids.
+    """
+    return load_frames(session_id, frame_idx, frame_idx + 1)
+
+
+def load_frames(session_id, start_idx, stop_idx):
+    """
+    Load the data of a range of frames from the columnar store.
+
+    Parameters:
+    - session_id (str): Session id.
+    - start_idx (int): The index of the first frame in the frame list.
+    - stop_idx (int): The index after the last frame in the frame list.
+
+    Returns:
+    - pd.DataFrame: The data of the frames, indexed by the row ids.
+    """
+    frame_index = cache_get(session_id, CACHE_KEYS["frame_index"])
+    start = frame_index[start_idx][0]
+    stop = frame_index[stop_idx - 1][1]
+
+    frames = get_dataset_table(session_id).slice(start, stop - start)
+    frames = frames.to_pandas(split_blocks=True)
+    frames.index = pd.RangeIndex(start, stop)
+
+    return frames
 
 
 def load_image(img_path):
@@ -323,17 +806,413 @@ def cache_get(id_str, key_major, key_minor=None):
 #     return None
 
 
-def filter_all(
+def get_category_mask(column, values):
+    """
+    Get the mask of the rows whose value is in the selected categories.
+
+    Parameters:
+    - column (pd.Series): The categorical column.
+    - values (list): The selected categorical values.
+
+    Returns:
+    - np.ndarray: The boolean mask.
+    """
+    # missing values never match a selection, same as an `==` comparison
+    values = [val for val in values if not pd.isna(val)]
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # look up the codes in a table instead of comparing the values
+        lookup = np.zeros(len(column.cat.categories) + 1, dtype=bool)
+        lookup[column.cat.categories.get_indexer(values)] = True
+        # code -1 (missing value) maps to the last entry, which stays False
+        lookup[-1] = False
+        return lookup[column.cat.codes.to_numpy()]
+
+    return column.isin(values).to_numpy()
+
+
+def get_key_mask(session_id, key, values, key_type):
+    """
+    Get the filter mask of a single key over the whole dataset of a session.
+
+    The mask is cached per key, so it is only recomputed when the values
+    of this key (or the dataset) change.
+
+    Parameters:
+    - session_id (str): Session id.
+    - key (str): The key to filter on.
+    - values (list): The numerical range or the categorical values.
+    - key_type (str): The type of the key, see `KEY_TYPES`.
+
+    Returns:
+    - np.ndarray: The boolean mask, or None if the key is not in the dataset.
+    """
+    record = cache_get(session_id, CACHE_KEYS["dataset"])
+    signature = (record["version"], key_type, repr(values))
+
+    cached = cache_get(session_id, CACHE_KEYS["filter_mask"], key)
+    if cached is not None and cached["signature"] == signature:
+        if cached["mask"] is None:
+            return None
+
+        return np.unpackbits(cached["mask"], count=cached["rows"]).view(bool)
+
+    column = load_dataset_column(session_id, key)
+    if column is None:
+        mask = None
+        packed = None
+        rows = 0
+    else:
+        if key_type == KEY_TYPES["NUM"]:
+            column = column.to_numpy()
+            mask = (column >= values[0]) & (column <= values[1])
+        else:
+            mask = get_category_mask(column, values)
+
+        packed = np.packbits(mask)
+        rows = len(mask)
+
+    cache_set(
+        {"signature": signature, "rows": rows, "mask": packed},
+        session_id,
+        CACHE_KEYS["filter_mask"],
+        key,
+    )
+    return mask
+
+
+def get_session_mask(session_id, num_list, num_values, cat_list, cat_values):
+    """
+    Get the filter mask over the whole dataset of a session.
+
+    Only the keys whose values have changed since the last call are
+    recomputed, the masks of the other keys are read from the cache.
+
+    Parameters:
+    - session_id (str): Session id.
+    - num_list (list): The list of numerical columns to filter on.
+    - num_values (list): The list of numerical filter values.
+    - cat_list (list): The list of categorical columns to filter on.
+    - cat_values (list): The list of categorical filter values.
+
+    Returns:
+    - np.ndarray: The boolean mask indexed by the row ids of the dataset.
+    """
+    mask = None
+    for f_idx, f_name in enumerate(num_list):
+        key_mask = get_key_mask(session_id, f_name, num_values[f_idx], KEY_TYPES["NUM"])
+        if key_mask is None:
+            continue
+
+        if mask is None:
+            mask = key_mask
+        else:
+            mask &= key_mask
+
+    for f_idx, f_name in enumerate(cat_list):
+        key_mask = get_key_mask(session_id, f_name, cat_values[f_idx], KEY_TYPES["CAT"])
+        if key_mask is None:
+            continue
+
+        if mask is None:
+            mask = key_mask
+        else:
+            mask &= key_mask
+
+    return mask
+
+
+def init_visibility(session_id, rows):
+    """
+    Create the visibility of the dataset of a session, all the rows visible.
+
+    The hidden rows are a packed bit array indexed by the row ids. The
+    rows that have been toggled since are kept in a small list of deltas,
+    so hiding a few points doesn't rewrite the whole bit array.
+
+    Parameters:
+    - session_id (str): Session id.
+    - rows (int): The number of rows of the dataset.
+    """
+    with frame_cache.transact():
+        cache_set(
+            {"rows": rows, "hidden": np.packbits(np.zeros(rows, dtype=bool))},
+            session_id,
+            CACHE_KEYS["visible_mask"],
+        )
+        cache_set(
+            {"ids": np.zeros(0, dtype=np.int64), "version": uuid.uuid4().hex},
+            session_id,
+            CACHE_KEYS["visible_delta"],
+        )
+
+
+def apply_visibility_delta(hidden, ids):
+    """
+    Toggle the rows of a hidden mask, in place.
+
+    Parameters:
+    - hidden (np.ndarray): The boolean mask of the hidden rows.
+    - ids (np.ndarray): The toggled row ids, a row toggled twice is unchanged.
+    """
+    ids, counts = np.unique(ids, return_counts=True)
+    hidden[ids[counts % 2 == 1]] ^= True
+
+
+def toggle_visibility(session_id, ids):
+    """
+    Toggle the visibility of rows, hidden rows become visible and visible
+    rows become hidden.
+
+    The row ids are appended to the deltas, which are merged into the bit
+    array once there are more than `VISIBLE_DELTA_SIZE` of them.
+
+    Parameters:
+    - session_id (str): Session id.
+    - ids (list): The row ids to toggle.
+    """
+    with frame_cache.transact():
+        delta = cache_get(session_id, CACHE_KEYS["visible_delta"])
+        ids = np.concatenate([delta["ids"], np.asarray(ids, dtype=np.int64)])
+
+        if len(ids) > VISIBLE_DELTA_SIZE:
+            record = cache_get(session_id, CACHE_KEYS["visible_mask"])
+            hidden = np.unpackbits(record["hidden"], count=record["rows"]).view(bool)
+            apply_visibility_delta(hidden, ids)
+            record["hidden"] = np.packbits(hidden)
+            cache_set(record, session_id, CACHE_KEYS["visible_mask"])
+            ids = np.zeros(0, dtype=np.int64)
+
+        cache_set(
+            {"ids": ids, "version": uuid.uuid4().hex},
+            session_id,
+            CACHE_KEYS["visible_delta"],
+        )
+
+
+def get_visible_mask(session_id):
+    """
+    Get the visibility of the dataset of a session.
+
+    Parameters:
+    - session_id (str): Session id.
+
+    Returns:
+    - np.ndarray: The boolean mask of the visible rows, indexed by the row
+        ids of the dataset.
+    """
+    with frame_cache.transact():
+        record = cache_get(session_id, CACHE_KEYS["visible_mask"])
+        delta = cache_get(session_id, CACHE_KEYS["visible_delta"])
+
+    hidden = np.unpackbits(record["hidden"], count=record["rows"]).view(bool)
+    apply_visibility_delta(hidden, delta["ids"])
+    return ~hidden
+
+
+def get_visible_version(session_id):
+    """
+    Get the version of the visibility of a session, which changes with
+    every toggle.
+
+    Parameters:
+    - session_id (str): Session id.
+
+    Returns:
+    - str: The version.
+    """
+    delta = cache_get(session_id, CACHE_KEYS["visible_delta"])
+    if delta is None:
+        return None
+
+    return delta["version"]
+
+
+def get_filter_signature(
+    session_id, num_list, num_values, cat_list, cat_values, visible_list
+):
+    """
+    Get the signature of the filter state of a session, which changes with
+    the dataset, the filter values and the visibility.
+
+    Parameters:
+    - session_id (str): Session id.
+    - num_list (list): The list of numerical columns to filter on.
+    - num_values (list): The list of numerical filter values.
+    - cat_list (list): The list of categorical columns to filter on.
+    - cat_values (list): The list of categorical filter values.
+    - visible_list (list): The list of visible values.
+
+    Returns:
+    - str: The signature.
+    """
+    record = cache_get(session_id, CACHE_KEYS["dataset"])
+    return repr(
+        (
+            record["version"],
+            num_list,
+            num_values,
+            cat_list,
+            cat_values,
+            visible_list,
+            get_visible_version(session_id),
+        )
+    )
+
+
+def get_shared_filter_mask(
+    session_id, num_list, num_values, cat_list, cat_values, visible_list
+):
+    """
+    Get the filter mask over the whole dataset of a session, including the
+    visibility, shared by all the views.
+
+    The mask is cached with the dataset version, the filter values and the
+    version of the visibility. The unpacked mask is also kept by the process,
+    so the frames filtered one by one don't unpack the whole mask again.
+    After a filter change, the views that
+    regenerate at the same time wait up to `FILTER_LOCK_WAIT` seconds for
+    the first one to compute the mask, and compute it themselves if it
+    isn't ready by then, so a killed job never blocks the other views.
+
+    Parameters:
+    - session_id (str): Session id.
+    - num_list (list): The list of numerical columns to filter on.
+    - num_values (list): The list of numerical filter values.
+    - cat_list (list): The list of categorical columns to filter on.
+    - cat_values (list): The list of categorical filter values.
+    - visible_list (list): The list of visible values.
+
+    Returns:
+    - np.ndarray: The boolean mask indexed by the row ids of the dataset.
+        The mask is shared with the process and is read-only.
+    """
+    signature = get_filter_signature(
+        session_id, num_list, num_values, cat_list, cat_values, visible_list
+    )
+
+    with _filter_masks_lock:
+        kept = _filter_masks.get(session_id)
+        if kept is not None and kept["signature"] == signature:
+            _filter_masks.move_to_end(session_id)
+            return kept["mask"]
+
+    def keep(mask):
+        mask.flags.writeable = False
+        with _filter_masks_lock:
+            _filter_masks[session_id] = {"signature": signature, "mask": mask}
+            _filter_masks.move_to_end(session_id)
+            while len(_filter_masks) > FRAME_RING_SESSIONS:
+                _filter_masks.popitem(last=False)
+
+        return mask
+
+    def get_cached():
+        cached = cache_get(session_id, CACHE_KEYS["filter_result"])
+        if cached is not None and cached["signature"] == signature:
+            return np.unpackbits(cached["mask"], count=cached["rows"]).view(bool)
+
+        return None
+
+    mask = get_cached()
+    if mask is not None:
+        return keep(mask)
+
+    # the first job that computes the mask claims the signature, the other
+    # views wait a little for its result and compute the mask themselves
+    # if it doesn't come, e.g. when the job that claimed it has been killed
+    lock_key = (
+        CACHE_KEYS["filter_result"]
+        + session_id
+        + "_LOCK_"
+        + hashlib.sha1(signature.encode()).hexdigest()
+    )
+    claimed = frame_cache.add(lock_key, True, expire=FILTER_LOCK_EXPIRE)
+    if not claimed:
+        deadline = time.monotonic() + FILTER_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            mask = get_cached()
+            if mask is not None:
+                return keep(mask)
+
+    try:
+        mask = get_session_mask(session_id, num_list, num_values, cat_list, cat_values)
+        if mask is None:
+            mask = np.ones(get_dataset_table(session_id).num_rows, dtype=bool)
+
+        if visible_list is not None and not visible_list:
+            mask = np.zeros_like(mask)
+        elif visible_list is not None and len(visible_list) == 1:
+            if visible_list[0] == "visible":
+                mask &= get_visible_mask(session_id)
+            else:
+                mask &= ~get_visible_mask(session_id)
+
+        cache_set(
+            {"signature": signature, "rows": len(mask), "mask": np.packbits(mask)},
+            session_id,
+            CACHE_KEYS["filter_result"],
+        )
+    finally:
+        if claimed:
+            frame_cache.delete(lock_key)
+
+    return keep(mask)
+
+
+def get_filtered_count(
+    session_id,
+    num_list,
+    num_values,
+    cat_list,
+    cat_values,
+    visible_list,
+    frame_idx=None,
+):
+    """
+    Count the filtered points of a session, without loading the data.
+
+    Parameters:
+    - session_id (str): Session id.
+    - num_list (list): The list of numerical columns to filter on.
+    - num_values (list): The list of numerical filter values.
+    - cat_list (list): The list of categorical columns to filter on.
+    - cat_values (list): The list of categorical filter values.
+    - visible_list (list): The list of visible values.
+    - frame_idx (int, optional): Only count the points of this frame.
+        Defaults to None, all the frames.
+
+    Returns:
+    - int: The number of filtered points.
+    """
+    mask = get_shared_filter_mask(
+        session_id, num_list, num_values, cat_list, cat_values, visible_list
+    )
+    if frame_idx is not None:
+        start, stop = cache_get(session_id, CACHE_KEYS["frame_index"])[frame_idx]
+        mask = mask[start:stop]
+
+    return int(np.count_nonzero(mask))
+
+
+def get_filter_mask(
     data,
     num_list,
     num_values,
     cat_list,
     cat_values,
-    visible_table=None,
+    visible_mask=None,
     visible_list=None,
+    session_id=None,
 ):
     """
-    Filter data based on numerical and categorical conditions.
+    Compute the filter mask based on numerical and categorical conditions.
+
+    All the range checks are fused into a single pass (with `numexpr` when
+    it is available), and the categorical conditions use `isin` instead of
+    comparing against every selected value. With a session id, the mask is
+    shared by all the views of the session, see `get_shared_filter_mask`.
 
     Parameters:
     - data (pd.DataFrame): The data to be filtered.
@@ -341,46 +1220,397 @@ def filter_all(
     - num_values (list): The list of numerical filter values.
     - cat_list (list): The list of categorical columns to filter on.
     - cat_values (list): The list of categorical filter values.
-    - visible_table (pd.DataFrame, optional): The visible table. Defaults to None.
+    - visible_mask (np.ndarray, optional): The boolean mask of the visible
+        rows, indexed by the row ids of the dataset. With a session id, the
+        visibility of the session is used instead. Defaults to None.
     - visible_list (list, optional): The list of visible values. Defaults to None.
+    - session_id (str, optional): Session id of the dataset that `data` is
+        taken from. Defaults to None.
 
     Returns:
-    - pd.DataFrame: The filtered data.
+    - np.ndarray: The boolean mask of the rows to keep.
     """
+    rows = len(data.index)
+
+    if visible_list is not None and not visible_list:
+        return np.zeros(rows, dtype=bool)
+
+    for f_idx, f_name in enumerate(cat_list):
+        if f_name in data.columns and not cat_values[f_idx]:
+            return np.zeros(rows, dtype=bool)
+
+    if session_id is not None:
+        # the mask of the whole dataset is shared by all the views
+        mask = get_shared_filter_mask(
+            session_id,
+            num_list,
+            num_values,
+            cat_list,
+            cat_values,
+            visible_list,
+        )
+        return mask[data.index.to_numpy()]
+
+    ranges = []
     for f_idx, f_name in enumerate(num_list):
         if f_name not in data.columns:
             continue
 
-        if f_idx == 0:
-            condition = (data[f_name] >= num_values[f_idx][0]) & (
-                data[f_name] <= num_values[f_idx][1]
-            )
-        else:
-            condition = (
-                condition
-                & (data[f_name] >= num_values[f_idx][0])
-                & (data[f_name] <= num_values[f_idx][1])
-            )
+        ranges.append(
+            (data[f_name].to_numpy(), num_values[f_idx][0], num_values[f_idx][1])
+        )
+
+    if not ranges:
+        mask = np.ones(rows, dtype=bool)
+    elif numexpr is not None and numexpr.detect_number_of_cores() > 1:
+        # evaluate all the range checks in one multi-threaded pass
+        local_dict = {}
+        expr = []
+        for r_idx, (column, low, high) in enumerate(ranges):
+            local_dict["c" + str(r_idx)] = column
+            local_dict["l" + str(r_idx)] = low
+            local_dict["h" + str(r_idx)] = high
+            expr.append("(c{0} >= l{0}) & (c{0} <= h{0})".format(r_idx))
+
+        mask = numexpr.evaluate(" & ".join(expr), local_dict=local_dict)
+    else:
+        mask = np.ones(rows, dtype=bool)
+        for column, low, high in ranges:
+            mask &= column >= low
+            mask &= column <= high
 
     for f_idx, f_name in enumerate(cat_list):
         if f_name not in data.columns:
             continue
 
-        if not cat_values[f_idx]:
-            condition = condition & False
-            break
+        mask &= get_category_mask(data[f_name], cat_values[f_idx])
+
+    if visible_list is not None and len(visible_list) == 1:
+        # the visibility is indexed by the row ids of the dataset
+        vis = visible_mask[data.index.to_numpy()]
+        if visible_list[0] == "visible":
+            mask &= vis
+        else:
+            mask &= ~vis
+
+    return mask
 
-        for val_idx, val in enumerate(cat_values[f_idx]):
-            if val_idx == 0:
-                val_condition = data[f_name] == val
-            else:
-                val_condition = val_condition | (data[f_name] == val)
 
-        condition = condition & val_condition
+def filter_all(
+    data,
+    num_list,
+    num_values,
+    cat_list,
+    cat_values,
+    visible_mask=None,
+    visible_list=None,
+    session_id=None,
+    columns=None,
+):
+    """
+    Filter data based on numerical and categorical conditions.
+
+    Parameters:
+    - data (pd.DataFrame): The data to be filtered.
+    - num_list (list): The list of numerical columns to filter on.
+    - num_values (list): The list of numerical filter values.
+    - cat_list (list): The list of categorical columns to filter on.
+    - cat_values (list): The list of categorical filter values.
+    - visible_mask (np.ndarray, optional): The boolean mask of the visible
+        rows, indexed by the row ids of the dataset. With a session id, the
+        visibility of the session is used instead. Defaults to None.
+    - visible_list (list, optional): The list of visible values. Defaults to None.
+    - session_id (str, optional): Session id of the dataset that `data` is
+        taken from, enables the mask shared by the views. Defaults to None.
+    - columns (list, optional): Only copy these columns of the filtered
+        rows. Defaults to None, all the columns.
+
+    Returns:
+    - pd.DataFrame: The filtered data.
+    """
+    mask = get_filter_mask(
+        data,
+        num_list,
+        num_values,
+        cat_list,
+        cat_values,
+        visible_mask,
+        visible_list,
+        session_id,
+    )
+
+    if columns is not None:
+        return data.loc[mask, list(dict.fromkeys(columns))]
+
+    return data.loc[mask]
+
+
+def load_filtered_dataset(
+    session_id, num_list, num_values, cat_list, cat_values, visible_list, columns
+):
+    """
+    Load some columns of the filtered rows of the dataset of a session.
+
+    The rows are taken with the filter mask shared by the views, see
+    `get_shared_filter_mask`, and only the selected columns of these rows
+    are converted from the memory-mapped table.
+
+    Parameters:
+    - session_id (str): Session id.
+    - num_list (list): The list of numerical columns to filter on.
+    - num_values (list): The list of numerical filter values.
+    - cat_list (list): The list of categorical columns to filter on.
+    - cat_values (list): The list of categorical filter values.
+    - visible_list (list): The list of visible values.
+    - columns (list): The columns to load.
+
+    Returns:
+    - pd.DataFrame: The filtered data, indexed by the row ids of the dataset.
+    """
+    mask = get_shared_filter_mask(
+        session_id, num_list, num_values, cat_list, cat_values, visible_list
+    )
+    rows = np.flatnonzero(mask)
+
+    table = get_dataset_table(session_id).select(list(dict.fromkeys(columns)))
+    data = table.take(rows).to_pandas(split_blocks=True)
+    data.index = rows
+
+    return data
+
+
+def drop_filtered_frames(session_id):
+    """
+    Drop the filtered frames and the filter mask of a session that are kept
+    by this process.
+
+    Parameters:
+    - session_id (str): Session id.
+    """
+    with _frame_rings_lock:
+        _frame_rings.pop(session_id, None)
+
+    with _filter_masks_lock:
+        _filter_masks.pop(session_id, None)
+
+
+def get_filtered_frames(
+    session_id, frame_ids, num_list, num_values, cat_list, cat_values, visible_list
+):
+    """
+    Get some filtered frames of a session.
+
+    The filtered frames are kept in a ring buffer of the process, tagged
+    with the filter signature. Stepping the slider with decay then filters
+    only the frame that is new, the past frames are taken from the buffer.
+    The buffer is dropped as soon as the filters or the visibility change.
+
+    Parameters:
+    - session_id (str): Session id.
+    - frame_ids (list): The indexes of the frames in the frame list.
+    - num_list (list): The list of numerical columns to filter on.
+    - num_values (list): The list of numerical filter values.
+    - cat_list (list): The list of categorical columns to filter on.
+    - cat_values (list): The list of categorical filter values.
+    - visible_list (list): The list of visible values.
+
+    Returns:
+    - list: The filtered frames, in the order of `frame_ids`. The frames are
+        shared with the buffer and must not be modified.
+    """
+    signature = get_filter_signature(
+        session_id, num_list, num_values, cat_list, cat_values, visible_list
+    )
+
+    with _frame_rings_lock:
+        ring = _frame_rings.get(session_id)
+        if ring is None or ring["signature"] != signature:
+            ring = {"signature": signature, "frames": OrderedDict()}
+            _frame_rings[session_id] = ring
+        _frame_rings.move_to_end(session_id)
+        while len(_frame_rings) > FRAME_RING_SESSIONS:
+            _frame_rings.popitem(last=False)
+
+    frames = []
+    for frame_idx in frame_ids:
+        with _frame_rings_lock:
+            frame = ring["frames"].get(frame_idx)
+            if frame is not None:
+                ring["frames"].move_to_end(frame_idx)
+
+        if frame is None:
+            frame = filter_all(
+                load_frame(session_id, frame_idx),
+                num_list,
+                num_values,
+                cat_list,
+                cat_values,
+                visible_list=visible_list,
+                session_id=session_id,
+            )
+
+            with _frame_rings_lock:
+                ring["frames"][frame_idx] = frame
+                while len(ring["frames"]) > FRAME_RING_SIZE:
+                    ring["frames"].popitem(last=False)
+
+        frames.append(frame)
+
+    return frames
+
+
+def get_relayout_range(relayout_data, axis):
+    """
+    Get the range of an axis that the user has zoomed or panned to.
+
+    Parameters:
+    - relayout_data (dict): The `relayoutData` of a 2D figure.
+    - axis (str): The name of the axis, e.g. `xaxis`.
+
+    Returns:
+    - list: The lower and upper limits of the axis, or None if the axis is
+        autoranged.
+    """
+    if not relayout_data:
+        return None
+
+    if axis + ".range" in relayout_data:
+        return sorted(relayout_data[axis + ".range"])
+
+    if axis + ".range[0]" in relayout_data and axis + ".range[1]" in relayout_data:
+        return sorted(
+            [relayout_data[axis + ".range[0]"], relayout_data[axis + ".range[1]"]]
+        )
+
+    return None
+
+
+def get_zoom_ranges(session_id, view, relayout_data, x_key, y_key, zoomed):
+    """
+    Get the ranges that the user has zoomed or panned a 2D view to.
+
+    The ranges are saved with the axis keys and the dataset version, and
+    they are reset as soon as the axes or the dataset change, so the ranges
+    of other axes are never applied. The axes that a zoom event doesn't
+    mention keep their range.
+
+    Parameters:
+    - session_id (str): Session id.
+    - view (str): The name of the view, e.g. `left`.
+    - relayout_data (dict): The `relayoutData` of the view.
+    - x_key (str): The key of the x-axis.
+    - y_key (str): The key of the y-axis.
+    - zoomed (bool): Whether the view has been zoomed or panned, i.e. the
+        callback is triggered by `relayoutData`.
+
+    Returns:
+    - list: The x and the y ranges, None for an autoranged axis.
+    """
+    version = cache_get(session_id, CACHE_KEYS["dataset"])["version"]
+    saved = cache_get(session_id, CACHE_KEYS["zoom_range"], view)
+    # new axes or a new dataset reset the zoom
+    reset = (
+        saved is None or saved["keys"] != [x_key, y_key] or saved["version"] != version
+    )
+    ranges = [None, None] if reset else list(saved["ranges"])
+
+    if zoomed:
+        for idx, axis in enumerate(["xaxis", "yaxis"]):
+            if any(key.startswith(axis + ".") for key in relayout_data or {}):
+                ranges[idx] = get_relayout_range(relayout_data, axis)
+    elif not reset:
+        return ranges
+
+    cache_set(
+        {"keys": [x_key, y_key], "version": version, "ranges": ranges},
+        session_id,
+        CACHE_KEYS["zoom_range"],
+        view,
+    )
+    return ranges
+
+
+def decimate_frame(data_frame, keys, budget, c_key=None, ranges=None):
+    """
+    Reduce the number of points of a figure to a point budget.
+
+    The points are binned on a grid over `keys` (and the color key, so that
+    every category keeps its extent), and one random point of every
+    occupied cell is kept, so sparse regions and outliers stay visible. The
+    rest of the budget is filled with a uniform random sample, which keeps
+    the density of the dense regions. The sampling is seeded, so the same
+    data always gives the same points.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data of the figure.
+    - keys (list): The keys of the axes.
+    - budget (int): The maximum number of points, `None` for no limit.
+    - c_key (str, optional): The key of the color data. Defaults to None.
+    - ranges (list, optional): The visible range of every key, `None` for
+        a key without a range. Above the budget, the points outside are
+        dropped before the decimation, so zooming in shows more detail.
+        Defaults to None.
+
+    Returns:
+    - pd.DataFrame: The decimated data, in the original order.
+    """
+    if budget is None or len(data_frame.index) <= budget:
+        return data_frame
+
+    if ranges is not None:
+        mask = np.ones(len(data_frame.index), dtype=bool)
+        for key, key_range in zip(keys, ranges):
+            if key_range is None:
+                continue
+
+            column = data_frame[key].to_numpy()
+            mask &= (column >= key_range[0]) & (column <= key_range[1])
+
+        if not np.all(mask):
+            data_frame = data_frame[mask]
+
+    rows = len(data_frame.index)
+    if budget is None or rows <= budget:
+        return data_frame
+
+    # the grid has about half of the budget cells, the other half of the
+    # points are sampled by density
+    bins = max(int((budget / 2) ** (1 / len(keys))), 1)
+    cell = np.zeros(rows, dtype=np.int64)
+    for key in keys:
+        column = data_frame[key].to_numpy(dtype=np.float64, na_value=np.nan)
+        low = np.nanmin(column) if np.any(np.isfinite(column)) else 0
+        high = np.nanmax(column) if np.any(np.isfinite(column)) else 0
+        scale = bins / (high - low) if high > low else 0
+        with np.errstate(invalid="ignore"):
+            key_bin = np.clip((column - low) * scale, 0, bins - 1)
+        # missing values go into a bin of their own
+        key_bin = np.where(np.isfinite(key_bin), key_bin, bins).astype(np.int64)
+        cell = cell * (bins + 1) + key_bin
+
+    num_cells = (bins + 1) ** len(keys)
+    if c_key is not None and c_key not in keys:
+        codes, uniques = pd.factorize(data_frame[c_key], use_na_sentinel=False)
+        cell = cell * len(uniques) + codes
+        num_cells *= len(uniques)
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(rows)
+    if num_cells <= rows:
+        # scatter the shuffled rows into a table of the cells instead of
+        # sorting, one of the rows of every cell is left
+        table = np.full(num_cells, -1, dtype=np.int64)
+        table[cell[order]] = order
+        cover = table[table >= 0]
+    else:
+        _, first = np.unique(cell[order], return_index=True)
+        cover = order[first]
+    if len(cover) > budget // 2:
+        cover = rng.choice(cover, budget // 2, replace=False)
 
-    if len(visible_list) == 1:
-        condition = condition & (visible_table["_VIS_"] == visible_list[0])
-    elif not visible_list:
-        condition = condition & False
+    keep = np.zeros(rows, dtype=bool)
+    keep[cover] = True
+    rest = order[~keep[order]][: budget - len(cover)]
+    keep[rest] = True
 
-    return data.loc[condition]
+    return data_frame[keep]
@@ -39,11 +39,11 @@ from dash.exceptions import PreventUpdate
 from viz.viz import get_heatmap
 
 from app_config import background_callback_manager
-from app_config import CACHE_KEYS
+from app_config import CACHE_KEYS, KEY_TYPES
 
-from utils import filter_all
-from utils import cache_get
-from utils import load_data
+from utils import get_filter_signature
+from utils import cache_get, cache_set
+from utils import load_filtered_dataset
 
 
 def get_heatmap_view_callbacks(app):
@@ -73,8 +73,6 @@ def get_heatmap_view_callbacks(app):
         state={
             "session_id": State("session-id", "data"),
             "visible_list": State("visible-picker", "value"),
-            "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         manager=background_callback_manager,
     )
@@ -87,8 +85,6 @@ def get_heatmap_view_callbacks(app):
         y_heat,
         session_id,
         visible_list,
-        file,
-        file_list,
     ):
         """
         Background callback function to regenerate the heatmap figure based on the input values.
@@ -101,8 +97,6 @@ def get_heatmap_view_callbacks(app):
         - y_heat (str): The selected y-axis key for the heatmap.
         - session_id (str): The ID of the current session.
         - visible_list (list): The list of visible items.
-        - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: A dictionary containing the updated heatmap figure.
@@ -130,25 +124,44 @@ def get_heatmap_view_callbacks(app):
         y_key = y_heat
         y_label = config["keys"][y_heat]["description"]
 
-        data = load_data(file_list, file)
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
+        # the heatmap only changes with the keys and the filter state, it is
+        # looked up before any data is loaded
+        signature = (
+            get_filter_signature(
+                session_id, num_keys, num_values, cat_keys, cat_values, visible_list
+            ),
+            x_key,
+            y_key,
+        )
+        cached = cache_get(session_id, CACHE_KEYS["heatmap"])
+        if cached is not None and cached["signature"] == signature:
+            return {
+                "heatmap": cached["figure"],
+            }
 
-        filtered_table = filter_all(
-            data,
+        data = load_filtered_dataset(
+            session_id,
             num_keys,
             num_values,
             cat_keys,
             cat_values,
-            visible_table,
             visible_list,
+            [x_key, y_key],
         )
 
         heat_fig = get_heatmap(
-            filtered_table,
+            data,
             x_key,
             y_key,
             x_label,
             y_label,
+            x_type=config["keys"][x_key].get("type", KEY_TYPES["NUM"]),
+            y_type=config["keys"][y_key].get("type", KEY_TYPES["NUM"]),
+        )
+        cache_set(
+            {"signature": signature, "figure": heat_fig},
+            session_id,
+            CACHE_KEYS["heatmap"],
         )
 
         return {
@@ -31,21 +31,19 @@ import os
 
 import datetime
 
-import pandas as pd
-
 import plotly.graph_objs as go
-import plotly.express as px
 
 from dash import dcc
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
 
+from viz.viz import get_histogram
+
 from app_config import background_callback_manager
-from app_config import CACHE_KEYS
+from app_config import CACHE_KEYS, KEY_TYPES
 
-from utils import filter_all
 from utils import cache_get
-from utils import load_data
+from utils import load_filtered_dataset
 
 
 def get_histogram_view_callbacks(app):
@@ -76,8 +74,6 @@ def get_histogram_view_callbacks(app):
         state={
             "session_id": State("session-id", "data"),
             "visible_list": State("visible-picker", "value"),
-            "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         manager=background_callback_manager,
     )
@@ -91,8 +87,6 @@ def get_histogram_view_callbacks(app):
         c_histogram,
         session_id,
         visible_list,
-        file,
-        file_list,
     ):
         """
         Background callback function to regenerate the histogram figure based on the input values.
@@ -106,8 +100,6 @@ def get_histogram_view_callbacks(app):
         - c_histogram (str): The selected color key for the histogram.
         - session_id (str): The ID of the current session.
         - visible_list (list): The list of visible items.
-        - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: A dictionary containing the updated histogram figure.
@@ -134,66 +126,32 @@ def get_histogram_view_callbacks(app):
         x_label = config["keys"][x_histogram]["description"]
         y_key = y_histogram
 
-        data = load_data(file_list, file)
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-        filtered_table = filter_all(
-            data,
+        filtered_table = load_filtered_dataset(
+            session_id,
             num_keys,
             num_values,
             cat_keys,
             cat_values,
-            visible_table,
             visible_list,
+            [x_key] if c_histogram == "None" else [x_key, c_histogram],
         )
 
         if y_key == "probability":
             y_label = "Probability"
         elif y_key == "density":
             y_label = "Density"
-        if c_histogram == "None":
-            if x_key == config["slider"]:
-                nbins = pd.unique(filtered_table[x_key]).size
-                histogram_fig = px.histogram(
-                    filtered_table,
-                    x=x_key,
-                    histnorm=y_key,
-                    opacity=1,
-                    barmode="group",
-                    nbins=nbins,
-                    labels={x_key: x_label, y_key: y_label},
-                )
-            else:
-                histogram_fig = px.histogram(
-                    filtered_table,
-                    x=x_key,
-                    histnorm=y_key,
-                    opacity=1,
-                    barmode="group",
-                    labels={x_key: x_label, y_key: y_label},
-                )
-        else:
-            if x_key == config["slider"]:
-                nbins = pd.unique(filtered_table[x_key]).size
-                histogram_fig = px.histogram(
-                    filtered_table,
-                    x=x_key,
-                    color=c_histogram,
-                    histnorm=y_key,
-                    opacity=1,
-                    barmode="group",
-                    nbins=nbins,
-                    labels={x_key: x_label, y_key: y_label},
-                )
-            else:
-                histogram_fig = px.histogram(
-                    filtered_table,
-                    x=x_key,
-                    color=c_histogram,
-                    histnorm=y_key,
-                    opacity=1,
-                    barmode="group",
-                    labels={x_key: x_label, y_key: y_label},
-                )
+
+        # bin on the server and only send the counts of the bins
+        histogram_fig = get_histogram(
+            filtered_table,
+            x_key,
+            None if c_histogram == "None" else c_histogram,
+            y_key,
+            x_label,
+            y_label,
+            x_type=config["keys"][x_key].get("type", KEY_TYPES["NUM"]),
+            unique_bins=x_key == config["slider"],
+        )
 
         return {
             "histogram": histogram_fig,
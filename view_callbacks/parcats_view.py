@@ -32,6 +32,7 @@ import os
 import datetime
 
 import numpy as np
+import pandas as pd
 
 import plotly.graph_objs as go
 
@@ -42,9 +43,8 @@ from dash.exceptions import PreventUpdate
 from app_config import background_callback_manager
 from app_config import CACHE_KEYS
 
-from utils import filter_all
 from utils import cache_get
-from utils import load_data
+from utils import load_filtered_dataset
 
 
 def get_parcats_view_callbacks(app):
@@ -74,8 +74,6 @@ def get_parcats_view_callbacks(app):
         state={
             "session_id": State("session-id", "data"),
             "visible_list": State("visible-picker", "value"),
-            "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         manager=background_callback_manager,
     )
@@ -88,8 +86,6 @@ def get_parcats_view_callbacks(app):
         c_key,
         session_id,
         visible_list,
-        file,
-        file_list,
     ):
         """
         Background callback function to regenerate the parallel coordinates figure
@@ -103,8 +99,6 @@ def get_parcats_view_callbacks(app):
         - c_key (str): The selected color key for the parallel coordinates.
         - session_id (str): The ID of the current session.
         - visible_list (list): The list of visible items.
-        - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: A dictionary containing the updated parallel coordinates figure.
@@ -126,36 +120,43 @@ def get_parcats_view_callbacks(app):
         num_values = filter_kwargs["num_values"]
 
         if len(dim_parallel) > 0:
-            data = load_data(file_list, file)
-            visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-            filtered_table = filter_all(
-                data,
+            # one path per combination of the categories (and the color),
+            # weighted by the number of rows
+            group_keys = list(dim_parallel)
+            if c_key != "None" and c_key not in group_keys:
+                group_keys.append(c_key)
+
+            data = load_filtered_dataset(
+                session_id,
                 num_keys,
                 num_values,
                 cat_keys,
                 cat_values,
-                visible_table,
                 visible_list,
+                group_keys,
+            )
+            counts = (
+                data.groupby(group_keys, sort=False, dropna=False, observed=True)
+                .size()
+                .reset_index(name="_COUNT_")
             )
 
             dims = []
             for _, dim_key in enumerate(dim_parallel):
-                dims.append(
-                    go.parcats.Dimension(values=filtered_table[dim_key], label=dim_key)
-                )
+                dims.append(go.parcats.Dimension(values=counts[dim_key], label=dim_key))
 
             if c_key != "None":
-                unique_list = np.sort(filtered_table[c_key].unique())
-
-                if np.issubdtype(unique_list.dtype, np.integer) or np.issubdtype(
-                    unique_list.dtype, np.floating
-                ):
+                c_dtype = counts[c_key].dtype
+                if pd.api.types.is_numeric_dtype(
+                    c_dtype
+                ) and not pd.api.types.is_bool_dtype(c_dtype):
                     parallel_fig = go.Figure(
                         data=[
                             go.Parcats(
                                 dimensions=dims,
+                                counts=counts["_COUNT_"],
                                 line={
-                                    "color": filtered_table[c_key],
+                                    "color": counts[c_key],
                                     "colorbar": dict(title=c_key),
                                 },
                                 hoveron="color",
@@ -165,15 +166,15 @@ def get_parcats_view_callbacks(app):
                         ]
                     )
                 else:
-                    filtered_table["_C_"] = np.zeros_like(filtered_table[c_key])
-                    for idx, var in enumerate(unique_list):
-                        filtered_table.loc[filtered_table[c_key] == var, "_C_"] = idx
+                    # the colors are the indexes of the sorted categories
+                    color_codes, _ = pd.factorize(counts[c_key], sort=True)
 
                     parallel_fig = go.Figure(
                         data=[
                             go.Parcats(
                                 dimensions=dims,
-                                line={"color": filtered_table["_C_"]},
+                                counts=counts["_COUNT_"],
+                                line={"color": np.maximum(color_codes, 0)},
                                 hoverinfo="count+probability",
                                 arrangement="freeform",
                             )
@@ -181,7 +182,13 @@ def get_parcats_view_callbacks(app):
                     )
             else:
                 parallel_fig = go.Figure(
-                    data=[go.Parcats(dimensions=dims, arrangement="freeform")]
+                    data=[
+                        go.Parcats(
+                            dimensions=dims,
+                            counts=counts["_COUNT_"],
+                            arrangement="freeform",
+                        )
+                    ]
                 )
         else:
             parallel_fig = {"data": [{"type": "histogram", "x": []}], "layout": {}}
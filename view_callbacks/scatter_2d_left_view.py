@@ -40,14 +40,15 @@ from dash import dcc
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
 
-from viz.viz import get_scatter2d
+from viz.viz import get_scatter2d, get_scatter2d_raster
 
 from app_config import background_callback_manager
 from app_config import CACHE_KEYS, KEY_TYPES
+from app_config import SCATTER2D_POINT_BUDGET, SCATTER2D_RASTER_SIZE
 
-from utils import filter_all
-from utils import cache_set, cache_get
-from utils import load_data
+from utils import filter_all, get_filtered_count, decimate_frame, get_zoom_ranges
+from utils import cache_set, cache_get, toggle_visibility
+from utils import load_filtered_dataset, load_frame
 
 
 def get_scatter_2d_left_view_callbacks(app):
@@ -129,14 +130,13 @@ def get_scatter_2d_left_view_callbacks(app):
             "x_left": Input("x-picker-2d-left", "value"),
             "y_left": Input("y-picker-2d-left", "value"),
             "color_left": Input("c-picker-2d-left", "value"),
+            "relayout": Input("scatter2d-left", "relayoutData"),
         },
         state={
             "slider_arg": State("slider-frame", "value"),
             "colormap": State("colormap-scatter2d-left", "value"),
             "session_id": State("session-id", "data"),
             "visible_list": State("visible-picker", "value"),
-            "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         manager=background_callback_manager,
         prevent_initial_call=True,
@@ -150,13 +150,12 @@ def get_scatter_2d_left_view_callbacks(app):
         x_left,
         y_left,
         color_left,
+        relayout,
         slider_arg,
         all_frame_sw,
         colormap,
         session_id,
         visible_list,
-        file,
-        file_list,
     ):
         """
         Background callback function to regenerate the left 2D scatter plot
@@ -171,11 +170,10 @@ def get_scatter_2d_left_view_callbacks(app):
         - x_left (str): The selected x-axis key for the left scatter plot.
         - y_left (str): The selected y-axis key for the left scatter plot.
         - color_left (str): The selected color key for the left scatter plot.
+        - relayout (dict): The zoom and pan of the left scatter plot.
         - colormap (str): The selected colormap for the left scatter plot.
         - session_id (str): The ID of the current session.
         - visible_list (list): The list of visible items.
-        - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: A dictionary containing the updated left 2D scatter plot figure.
@@ -191,6 +189,12 @@ def get_scatter_2d_left_view_callbacks(app):
 
             return {"figure": left_fig}
 
+        trigger_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
+        if trigger_id == "scatter2d-left" and not any(
+            key.startswith(("xaxis.", "yaxis.")) for key in (relayout or {})
+        ):
+            raise PreventUpdate
+
         config = cache_get(session_id, CACHE_KEYS["config"])
 
         filter_kwargs = cache_get(session_id, CACHE_KEYS["filter_kwargs"])
@@ -206,24 +210,82 @@ def get_scatter_2d_left_view_callbacks(app):
         y_label = config["keys"][y_left]["description"]
         c_label = config["keys"][color_left]["description"]
 
-        if all_frame_sw == "all":
-            data = load_data(file_list, file)
+        # the zoom is kept for the same axes, and reset when the axes or the
+        # dataset change
+        x_range, y_range = get_zoom_ranges(
+            session_id,
+            "left",
+            relayout,
+            x_key,
+            y_key,
+            trigger_id == "scatter2d-left",
+        )
+
+        # only a zoom or pan into a decimated figure changes the points, the
+        # points are counted with the shared filter mask before any data is
+        # loaded
+        if trigger_id == "scatter2d-left" and all_frame_sw != "raster":
+            num_points = get_filtered_count(
+                session_id,
+                num_keys,
+                num_values,
+                cat_keys,
+                cat_values,
+                visible_list,
+                None if all_frame_sw == "all" else slider_arg,
+            )
+            if num_points <= SCATTER2D_POINT_BUDGET:
+                raise PreventUpdate
+
+        if all_frame_sw in ("all", "raster"):
+            filtered_table = load_filtered_dataset(
+                session_id,
+                num_keys,
+                num_values,
+                cat_keys,
+                cat_values,
+                visible_list,
+                [x_key, y_key, c_key],
+            )
         else:
-            frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
-            data = cache_get(
-                session_id, CACHE_KEYS["frame_data"], str(frame_list[slider_arg])
+            filtered_table = filter_all(
+                load_frame(session_id, slider_arg),
+                num_keys,
+                num_values,
+                cat_keys,
+                cat_values,
+                visible_list=visible_list,
+                session_id=session_id,
+                columns=[x_key, y_key, c_key],
+            )
+
+        if all_frame_sw == "raster":
+            # the image has the same size for any number of points, and is
+            # rasterized again for the zoomed ranges
+            left_fig = get_scatter2d_raster(
+                filtered_table,
+                x_key,
+                y_key,
+                c_key,
+                x_label,
+                y_label,
+                uirevision=c_label,
+                colormap=colormap,
+                c_label=c_label,
+                c_type=config["keys"][c_key].get("type", KEY_TYPES["NUM"]),
+                size=SCATTER2D_RASTER_SIZE,
+                x_range=x_range,
+                y_range=y_range,
             )
 
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
+            return {"figure": left_fig}
 
-        filtered_table = filter_all(
-            data,
-            num_keys,
-            num_values,
-            cat_keys,
-            cat_values,
-            visible_table,
-            visible_list,
+        filtered_table = decimate_frame(
+            filtered_table,
+            [x_key, y_key],
+            SCATTER2D_POINT_BUDGET,
+            c_key,
+            [x_range, y_range],
         )
 
         left_fig = get_scatter2d(
@@ -240,54 +302,37 @@ def get_scatter_2d_left_view_callbacks(app):
 
         return {"figure": left_fig}
 
-    @app.callback(
-        output={
-            "figure": Output("scatter2d-left", "figure", allow_duplicate=True),
-        },
-        inputs={
-            "colormap": Input("colormap-scatter2d-left", "value"),
-        },
-        state={
-            "fig_in": State("scatter2d-left", "figure"),
-            "left_sw": State("left-switch", "value"),
-        },
-        prevent_initial_call=True,
-    )
-    def scatter2d_left_colormap_change_callback(
-        colormap,
-        fig_in,
-        left_sw,
-    ):
-        """
-        Callback function to update the colormap of the left 2D scatter plot.
-
-        Parameters:
-        - colormap (str): The selected colormap.
-        - fig_in (dict): The current figure of the left 2D scatter plot.
-        - left_sw (bool): The value of the left switch.
-
-        Returns:
-        - dict: A dictionary containing the updated figure of the left 2D scatter plot.
-
-        Output Properties:
-        - figure (dict): The updated figure of the left 2D scatter plot.
+    # The colormap is switched in the browser with a partial update of the
+    # figure, the points are not sent to the server and back.
+    app.clientside_callback(
         """
-        if not left_sw:
-            left_fig = {
-                "data": [{"mode": "markers", "type": "scattergl", "x": [], "y": []}],
-                "layout": {},
+        function(colormap, fig, left_sw) {
+            if (!left_sw || left_sw.length === 0) {
+                return {
+                    data: [{mode: "markers", type: "scattergl", x: [], y: []}],
+                    layout: {},
+                };
             }
-
-            return {
-                "figure": left_fig,
+            if (!fig || !fig.data) {
+                return window.dash_clientside.no_update;
             }
-
-        for idx in range(0, len(fig_in["data"])):
-            fig_in["data"][idx]["marker"]["colorscale"] = colormap
-
-        return {
-            "figure": fig_in,
+            const patch = new window.dash_clientside.Patch();
+            fig.data.forEach((trace, idx) => {
+                if (trace.type === "heatmap") {
+                    patch.assign(["data", idx, "colorscale"], colormap);
+                } else {
+                    patch.assign(["data", idx, "marker", "colorscale"], colormap);
+                }
+            });
+            return patch.build();
         }
+        """,
+        Output("scatter2d-left", "figure", allow_duplicate=True),
+        Input("colormap-scatter2d-left", "value"),
+        State("scatter2d-left", "figure"),
+        State("left-switch", "value"),
+        prevent_initial_call=True,
+    )
 
     @app.callback(
         output={
@@ -409,18 +454,7 @@ def get_scatter_2d_left_view_callbacks(app):
         if selected_data is None:
             raise PreventUpdate
 
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-
         s_data = pd.DataFrame(selected_data["points"])
-        idx = s_data["id"]
-        idx.index = idx
-
-        vis_idx = idx[visible_table["_VIS_"][idx] == "visible"]
-        hid_idx = idx[visible_table["_VIS_"][idx] == "hidden"]
-
-        visible_table.loc[vis_idx, "_VIS_"] = "hidden"
-        visible_table.loc[hid_idx, "_VIS_"] = "visible"
-
-        cache_set(visible_table, session_id, CACHE_KEYS["visible_table"])
+        toggle_visibility(session_id, s_data["id"].to_numpy())
 
         return {"output_trigger": trigger_idx + 1}
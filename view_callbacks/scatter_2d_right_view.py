@@ -40,14 +40,15 @@ from dash import dcc
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
 
-from viz.viz import get_scatter2d
+from viz.viz import get_scatter2d, get_scatter2d_raster
 
 from app_config import background_callback_manager
 from app_config import CACHE_KEYS, KEY_TYPES
+from app_config import SCATTER2D_POINT_BUDGET, SCATTER2D_RASTER_SIZE
 
-from utils import filter_all
-from utils import cache_get, cache_set
-from utils import load_data
+from utils import filter_all, get_filtered_count, decimate_frame, get_zoom_ranges
+from utils import cache_get, cache_set, toggle_visibility
+from utils import load_filtered_dataset, load_frame
 
 
 def get_scatter_2d_right_view_callbacks(app):
@@ -129,14 +130,13 @@ def get_scatter_2d_right_view_callbacks(app):
             "x_right": Input("x-picker-2d-right", "value"),
             "y_right": Input("y-picker-2d-right", "value"),
             "color_right": Input("c-picker-2d-right", "value"),
+            "relayout": Input("scatter2d-right", "relayoutData"),
         },
         state={
             "slider_arg": State("slider-frame", "value"),
             "colormap": State("colormap-scatter2d-right", "value"),
             "session_id": State("session-id", "data"),
             "visible_list": State("visible-picker", "value"),
-            "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         manager=background_callback_manager,
         prevent_initial_call=True,
@@ -150,13 +150,12 @@ def get_scatter_2d_right_view_callbacks(app):
         x_right,
         y_right,
         color_right,
+        relayout,
         slider_arg,
         all_frame_sw,
         colormap,
         session_id,
         visible_list,
-        file,
-        file_list,
     ):
         """
         Background callback function to regenerate the right 2D scatter plot based on
@@ -170,11 +169,10 @@ def get_scatter_2d_right_view_callbacks(app):
         - x_right (str): The selected x-axis key for the right scatter plot.
         - y_right (str): The selected y-axis key for the right scatter plot.
         - color_right (str): The selected color key for the right scatter plot.
+        - relayout (dict): The zoom and pan of the right scatter plot.
         - colormap (str): The selected colormap for the right scatter plot.
         - session_id (str): The ID of the current session.
         - visible_list (list): The list of visible items.
-        - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: A dictionary containing the updated right 2D scatter plot figure.
@@ -192,6 +190,12 @@ def get_scatter_2d_right_view_callbacks(app):
                 "figure": right_fig,
             }
 
+        trigger_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
+        if trigger_id == "scatter2d-right" and not any(
+            key.startswith(("xaxis.", "yaxis.")) for key in (relayout or {})
+        ):
+            raise PreventUpdate
+
         config = cache_get(session_id, CACHE_KEYS["config"])
         keys_dict = config["keys"]
 
@@ -208,23 +212,82 @@ def get_scatter_2d_right_view_callbacks(app):
         y_label = keys_dict[y_right]["description"]
         c_label = keys_dict[color_right]["description"]
 
-        if all_frame_sw == "all":
-            data = load_data(file_list, file)
+        # the zoom is kept for the same axes, and reset when the axes or the
+        # dataset change
+        x_range, y_range = get_zoom_ranges(
+            session_id,
+            "right",
+            relayout,
+            x_key,
+            y_key,
+            trigger_id == "scatter2d-right",
+        )
+
+        # only a zoom or pan into a decimated figure changes the points, the
+        # points are counted with the shared filter mask before any data is
+        # loaded
+        if trigger_id == "scatter2d-right" and all_frame_sw != "raster":
+            num_points = get_filtered_count(
+                session_id,
+                num_keys,
+                num_values,
+                cat_keys,
+                cat_values,
+                visible_list,
+                None if all_frame_sw == "all" else slider_arg,
+            )
+            if num_points <= SCATTER2D_POINT_BUDGET:
+                raise PreventUpdate
+
+        if all_frame_sw in ("all", "raster"):
+            filtered_table = load_filtered_dataset(
+                session_id,
+                num_keys,
+                num_values,
+                cat_keys,
+                cat_values,
+                visible_list,
+                [x_key, y_key, c_key],
+            )
         else:
-            frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
-            data = cache_get(
-                session_id, CACHE_KEYS["frame_data"], str(frame_list[slider_arg])
+            filtered_table = filter_all(
+                load_frame(session_id, slider_arg),
+                num_keys,
+                num_values,
+                cat_keys,
+                cat_values,
+                visible_list=visible_list,
+                session_id=session_id,
+                columns=[x_key, y_key, c_key],
+            )
+
+        if all_frame_sw == "raster":
+            # the image has the same size for any number of points, and is
+            # rasterized again for the zoomed ranges
+            right_fig = get_scatter2d_raster(
+                filtered_table,
+                x_key,
+                y_key,
+                c_key,
+                x_label,
+                y_label,
+                uirevision=c_label,
+                colormap=colormap,
+                c_label=c_label,
+                c_type=keys_dict[c_key].get("type", KEY_TYPES["NUM"]),
+                size=SCATTER2D_RASTER_SIZE,
+                x_range=x_range,
+                y_range=y_range,
             )
 
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-        filtered_table = filter_all(
-            data,
-            num_keys,
-            num_values,
-            cat_keys,
-            cat_values,
-            visible_table,
-            visible_list,
+            return {"figure": right_fig}
+
+        filtered_table = decimate_frame(
+            filtered_table,
+            [x_key, y_key],
+            SCATTER2D_POINT_BUDGET,
+            c_key,
+            [x_range, y_range],
         )
 
         right_fig = get_scatter2d(
@@ -243,54 +306,37 @@ def get_scatter_2d_right_view_callbacks(app):
             "figure": right_fig,
         }
 
-    @app.callback(
-        output={
-            "figure": Output("scatter2d-right", "figure", allow_duplicate=True),
-        },
-        inputs={
-            "colormap": Input("colormap-scatter2d-right", "value"),
-        },
-        state={
-            "fig_in": State("scatter2d-right", "figure"),
-            "right_sw": State("right-switch", "value"),
-        },
-        prevent_initial_call=True,
-    )
-    def scatter2d_right_colormap_change_callback(
-        colormap,
-        fig_in,
-        right_sw,
-    ):
+    # The colormap is switched in the browser with a partial update of the
+    # figure, the points are not sent to the server and back.
+    app.clientside_callback(
         """
-        Callback function to update the colormap of the right 2D scatter plot.
-
-        Parameters:
-        - colormap (str): The selected colormap.
-        - fig_in (dict): The current figure of the right 2D scatter plot.
-        - right_sw (bool): The value of the right switch.
-
-        Returns:
-        - dict: A dictionary containing the updated figure of the right 2D scatter plot.
-
-        Output Properties:
-        - figure (dict): The updated figure of the right 2D scatter plot.
-        """
-        if not right_sw:
-            right_fig = {
-                "data": [{"mode": "markers", "type": "scattergl", "x": [], "y": []}],
-                "layout": {},
+        function(colormap, fig, right_sw) {
+            if (!right_sw || right_sw.length === 0) {
+                return {
+                    data: [{mode: "markers", type: "scattergl", x: [], y: []}],
+                    layout: {},
+                };
             }
-
-            return {
-                "figure": right_fig,
+            if (!fig || !fig.data) {
+                return window.dash_clientside.no_update;
             }
-
-        for idx in range(0, len(fig_in["data"])):
-            fig_in["data"][idx]["marker"]["colorscale"] = colormap
-
-        return {
-            "figure": fig_in,
+            const patch = new window.dash_clientside.Patch();
+            fig.data.forEach((trace, idx) => {
+                if (trace.type === "heatmap") {
+                    patch.assign(["data", idx, "colorscale"], colormap);
+                } else {
+                    patch.assign(["data", idx, "marker", "colorscale"], colormap);
+                }
+            });
+            return patch.build();
         }
+        """,
+        Output("scatter2d-right", "figure", allow_duplicate=True),
+        Input("colormap-scatter2d-right", "value"),
+        State("scatter2d-right", "figure"),
+        State("right-switch", "value"),
+        prevent_initial_call=True,
+    )
 
     @app.callback(
         output={
@@ -412,18 +458,7 @@ def get_scatter_2d_right_view_callbacks(app):
         if selected_data is None:
             raise PreventUpdate
 
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-
         s_data = pd.DataFrame(selected_data["points"])
-        idx = s_data["id"]
-        idx.index = idx
-
-        vis_idx = idx[visible_table["_VIS_"][idx] == "visible"]
-        hid_idx = idx[visible_table["_VIS_"][idx] == "hidden"]
-
-        visible_table.loc[vis_idx, "_VIS_"] = "hidden"
-        visible_table.loc[hid_idx, "_VIS_"] = "visible"
-
-        cache_set(visible_table, session_id, CACHE_KEYS["visible_table"])
+        toggle_visibility(session_id, s_data["id"].to_numpy())
 
         return {"output_trigger": trigger_idx + 1}
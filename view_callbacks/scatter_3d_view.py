@@ -30,30 +30,34 @@
 import json
 import os
 import datetime
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 
 import dash
-from dash import dcc
-from dash.dependencies import Input, Output, State, ALL
+from dash import dcc, Patch
+from dash.dependencies import Input, Output, State, ALL, ClientsideFunction
 from dash.exceptions import PreventUpdate
 import plotly.io as pio
 import plotly.graph_objs as go
 
 from app_config import background_callback_manager
 from app_config import CACHE_KEYS, KEY_TYPES
+from app_config import BUFFER_WORKERS, BUFFER_CHUNK_SIZE, HOVER_TEMPLATE
+from app_config import SCATTER3D_POINT_BUDGET
 
-from utils import filter_all
-from utils import cache_set, cache_get, cache_expire
-from utils import load_data
+from utils import filter_all, get_filtered_frames, decimate_frame
+from utils import cache_set, cache_get, cache_expire, toggle_visibility
+from utils import load_dataset, load_frame, load_frames
 from utils import load_image
+from utils import get_hover_table, load_hover_text
 from utils import prepare_figure_kwargs
 
 from viz.viz import get_scatter3d
 from viz.viz import get_animation_data
 from viz.graph_data import get_scatter3d_data, get_ref_scatter3d_data
-from viz.graph_data import get_hover_strings
-from viz.graph_layout import get_scatter3d_layout
+from viz.graph_data import get_hover_data, get_category_groups
+from viz.graph_layout import get_scatter3d_layout, get_scatter3d_images
 
 
 def process_single_frame(
@@ -101,9 +105,6 @@ def process_single_frame(
     cat_keys = filter_kwargs["cat_keys"]
     num_keys = filter_kwargs["num_keys"]
 
-    # get visibility table from Redis
-    visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-
     # get frame list from Redis
     frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
 
@@ -116,6 +117,7 @@ def process_single_frame(
         num_values,
         frame_idx,
     )
+    fig_kwargs["typed_array"] = True
 
     file = json.loads(file)
     img_path = os.path.join(
@@ -125,23 +127,45 @@ def process_single_frame(
     # encode image frame
     fig_kwargs["image"] = load_image(img_path)
 
-    # get a single frame data from Redis
-    data = cache_get(session_id, CACHE_KEYS["frame_data"], str(frame_list[frame_idx]))
-
-    filterd_frame = filter_all(
-        data, num_keys, num_values, cat_keys, cat_values, visible_table, visible_list
+    # the current frame and the decay frames, the frames that were filtered
+    # for the previous slider steps are reused
+    filtered_frames = get_filtered_frames(
+        session_id,
+        range(frame_idx, max(frame_idx - decay, 0) - 1, -1),
+        num_keys,
+        num_values,
+        cat_keys,
+        cat_values,
+        visible_list,
     )
-    fig = get_scatter3d_data(filterd_frame, **fig_kwargs)
+    filterd_frame = filtered_frames[0]
     c_type = keys_dict[c_key].get("type", KEY_TYPES["NUM"])
+
+    # the categories are split once for the traces and the hover
+    c_groups = None
+    if c_type == "categorical":
+        c_groups = get_category_groups(filterd_frame[c_key])
+
+    fig = get_scatter3d_data(filterd_frame, c_groups=c_groups, **fig_kwargs)
     if load_hover:
-        hover_list = get_hover_strings(
-            filterd_frame, fig_kwargs["c_key"], c_type, keys_dict
-        )
+        if HOVER_TEMPLATE:
+            hover_text = None
+        else:
+            hover_text = load_hover_text(
+                session_id, keys_dict, filterd_frame.index.to_numpy()
+            )
 
-        if hover_list:
-            for idx, hover_str in enumerate(hover_list):
-                fig[idx]["text"] = hover_str
-                fig[idx]["hovertemplate"] = "%{text}"
+        hover_list = get_hover_data(
+            filterd_frame,
+            fig_kwargs["c_key"],
+            c_type,
+            keys_dict,
+            hover_text,
+            HOVER_TEMPLATE,
+            c_groups,
+        )
+        for idx, hover_props in enumerate(hover_list):
+            fig[idx].update(hover_props)
 
     if c_type == "numerical":
         if "marker" in fig[0]:
@@ -150,20 +174,7 @@ def process_single_frame(
     if decay > 0:
         for val in range(1, decay + 1):
             if (frame_idx - val) >= 0:
-                # filter the data
-                frame_temp = filter_all(
-                    cache_get(
-                        session_id,
-                        CACHE_KEYS["frame_data"],
-                        str(frame_list[frame_idx - val]),
-                    ),
-                    num_keys,
-                    num_values,
-                    cat_keys,
-                    cat_values,
-                    visible_table,
-                    visible_list,
-                )
+                frame_temp = filtered_frames[val]
                 fig_kwargs["opacity"] = opacity[val]
                 fig_kwargs["name"] = (
                     "Index: "
@@ -174,16 +185,24 @@ def process_single_frame(
                     + str(frame_list[frame_idx - val])
                     + ")"
                 )
-                new_fig = get_scatter3d_data(frame_temp, **fig_kwargs)
+                c_groups = None
+                if c_type == "categorical":
+                    c_groups = get_category_groups(frame_temp[c_key])
+
+                new_fig = get_scatter3d_data(
+                    frame_temp, c_groups=c_groups, **fig_kwargs
+                )
                 if load_hover:
-                    hover_list = get_hover_strings(
-                        frame_temp, fig_kwargs["c_key"], c_type, keys_dict
+                    hover_list = get_hover_data(
+                        frame_temp,
+                        fig_kwargs["c_key"],
+                        c_type,
+                        keys_dict,
+                        template=HOVER_TEMPLATE,
+                        c_groups=c_groups,
                     )
-
-                    if hover_list:
-                        for idx, hover_str in enumerate(hover_list):
-                            new_fig[idx]["text"] = hover_str
-                            new_fig[idx]["hovertemplate"] = "%{text}"
+                    for idx, hover_props in enumerate(hover_list):
+                        new_fig[idx].update(hover_props)
 
                 if c_type == "numerical":
                     if "marker" in new_fig[0]:
@@ -214,6 +233,27 @@ def process_single_frame(
     return fig
 
 
+def get_frame_patch(data, images):
+    """
+    Get the partial update of the 3D scatter plot for a slider step.
+
+    Stepping the slider changes the traces and the image of the frame only,
+    the rest of the layout on the page is kept as it is.
+
+    Parameters:
+    - data (list): The traces of the frame.
+    - images (list): The layout images of the frame.
+
+    Returns:
+    - Patch: The partial update of the figure.
+    """
+    patch = Patch()
+    patch["data"] = data
+    patch["layout"]["images"] = images
+
+    return patch
+
+
 def process_overlay_frame(
     frame_idx,
     config,
@@ -223,8 +263,6 @@ def process_overlay_frame(
     visible_list,
     c_key,
     session_id,
-    file,
-    file_list,
     load_hover=False,
 ):
     """
@@ -239,9 +277,6 @@ def process_overlay_frame(
     - visible_list (list): The list of visible items.
     - c_key (str): The selected color key.
     - session_id (str): The ID of the current session.
-    - case (str): The selected case.
-    - file (str): The selected file.
-    - file_list (list): The list of selected files.
     - load_hover (bool): Whether to load hover strings or not.
 
     Returns:
@@ -255,9 +290,6 @@ def process_overlay_frame(
     cat_keys = filter_kwargs["cat_keys"]
     num_keys = filter_kwargs["num_keys"]
 
-    # get visibility table from Redis
-    visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-
     # get frame list from Redis
     frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
 
@@ -270,30 +302,58 @@ def process_overlay_frame(
         num_values,
         frame_idx,
     )
+    fig_kwargs["typed_array"] = True
 
     # overlay all the frames
-    # get data from .feather file on the disk
-    data = load_data(file_list, file)
+    # get data from the columnar store
+    data = load_dataset(session_id)
     filterd_frame = filter_all(
-        data, num_keys, num_values, cat_keys, cat_values, visible_table, visible_list
+        data,
+        num_keys,
+        num_values,
+        cat_keys,
+        cat_values,
+        visible_list=visible_list,
+        session_id=session_id,
+    )
+    # keep the browser responsive on large datasets
+    filterd_frame = decimate_frame(
+        filterd_frame,
+        [fig_kwargs["x_key"], fig_kwargs["y_key"], fig_kwargs["z_key"]],
+        SCATTER3D_POINT_BUDGET,
+        c_key,
     )
     fig_kwargs["image"] = None
 
-    # generate the graph
-    fig = get_scatter3d(filterd_frame, **fig_kwargs)
-
     keys_dict = config["keys"]
     c_type = keys_dict[c_key].get("type", KEY_TYPES["NUM"])
 
+    c_groups = None
+    if c_type == "categorical":
+        c_groups = get_category_groups(filterd_frame[c_key])
+
+    # generate the graph
+    fig = get_scatter3d(filterd_frame, c_groups=c_groups, **fig_kwargs)
+
     if load_hover:
-        hover_list = get_hover_strings(
-            filterd_frame, fig_kwargs["c_key"], c_type, keys_dict
-        )
+        if HOVER_TEMPLATE:
+            hover_text = None
+        else:
+            hover_text = load_hover_text(
+                session_id, keys_dict, filterd_frame.index.to_numpy()
+            )
 
-        if hover_list:
-            for idx, hover_str in enumerate(hover_list):
-                fig["data"][idx]["text"] = hover_str
-                fig["data"][idx]["hovertemplate"] = "%{text}"
+        hover_list = get_hover_data(
+            filterd_frame,
+            fig_kwargs["c_key"],
+            c_type,
+            keys_dict,
+            hover_text,
+            HOVER_TEMPLATE,
+            c_groups,
+        )
+        for idx, hover_props in enumerate(hover_list):
+            fig["data"][idx].update(hover_props)
 
     if c_type == "numerical":
         if "marker" in fig["data"][0]:
@@ -302,6 +362,149 @@ def process_overlay_frame(
     return fig
 
 
+def build_frame_buffer(
+    frame_range,
+    trigger_idx,
+    config,
+    cat_values,
+    num_values,
+    visible_list,
+    c_key,
+    session_id,
+    file,
+):
+    """
+    Build the figure buffer of a range of frames and save it into the cache.
+
+    It runs in the worker processes of the buffer builder, and stops as soon
+    as a newer buffering task has been started.
+
+    Parameters:
+    - frame_range (tuple): The (start, stop) indexes of the frames.
+    - trigger_idx (int): The trigger value of the buffering task.
+    - config (dict): The configuration dictionary.
+    - cat_values (dict): The selected categorical values for filtering.
+    - num_values (dict): The selected numerical values for filtering.
+    - visible_list (list): The list of visible items.
+    - c_key (str): The selected color key.
+    - session_id (str): The ID of the current session.
+    - file (str): The file to load the images from.
+
+    Returns:
+    - bool: False if the buffering task has been cancelled.
+    """
+    keys_dict = config["keys"]
+
+    slider_label = keys_dict[config["slider"]]["description"]
+
+    filter_kwargs = cache_get(session_id, CACHE_KEYS["filter_kwargs"])
+    cat_keys = filter_kwargs["cat_keys"]
+    num_keys = filter_kwargs["num_keys"]
+
+    frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
+
+    # filter all the frames of the range at once
+    start, stop = frame_range
+    filtered_table = filter_all(
+        load_frames(session_id, start, stop),
+        num_keys,
+        num_values,
+        cat_keys,
+        cat_values,
+        visible_list=visible_list,
+        session_id=session_id,
+    )
+
+    # locate the frames in the filtered table with the frame index
+    frame_index = cache_get(session_id, CACHE_KEYS["frame_index"])
+    frame_index = np.searchsorted(filtered_table.index.to_numpy(), frame_index)
+
+    # the hover text is preformatted once for the whole dataset, unless it
+    # is rendered by the browser
+    if HOVER_TEMPLATE:
+        hover_text = None
+    else:
+        hover_text = load_hover_text(
+            session_id, keys_dict, filtered_table.index.to_numpy()
+        )
+
+    # prepare figure key word arguments
+    fig_kwargs = prepare_figure_kwargs(
+        config,
+        frame_list,
+        c_key,
+        num_keys,
+        num_values,
+    )
+    # buffer the frames as binary arrays instead of pandas objects
+    fig_kwargs["typed_array"] = True
+
+    file = json.loads(file)
+    for slider_arg in range(start, stop):
+        img_path = os.path.join(
+            file["path"], file["name"][0:-4], str(frame_list[slider_arg]) + ".jpg"
+        )
+
+        # encode image frame
+        fig_kwargs["image"] = load_image(img_path)
+
+        fig_kwargs["name"] = (
+            "Index: "
+            + str(slider_arg)
+            + " ("
+            + slider_label
+            + ": "
+            + str(frame_list[slider_arg])
+            + ")"
+        )
+
+        filterd_frame = filtered_table.iloc[
+            frame_index[slider_arg][0] : frame_index[slider_arg][1]
+        ]
+
+        c_groups = None
+        if fig_kwargs["c_type"] == "categorical":
+            c_groups = get_category_groups(filterd_frame[fig_kwargs["c_key"]])
+
+        fig = get_scatter3d_data(filterd_frame, c_groups=c_groups, **fig_kwargs)
+
+        hover_data = get_hover_data(
+            filterd_frame,
+            fig_kwargs["c_key"],
+            fig_kwargs["c_type"],
+            keys_dict,
+            None
+            if hover_text is None
+            else hover_text[frame_index[slider_arg][0] : frame_index[slider_arg][1]],
+            HOVER_TEMPLATE,
+            c_groups,
+        )
+        if fig_kwargs["x_ref"] is not None and fig_kwargs["y_ref"] is not None:
+            ref_fig = [
+                get_ref_scatter3d_data(
+                    data_frame=filterd_frame,
+                    x_key=fig_kwargs["x_ref"],
+                    y_key=fig_kwargs["y_ref"],
+                    z_key=None,
+                    name=fig_kwargs.get("ref_name", None),
+                )
+            ]
+        else:
+            ref_fig = []
+
+        if trigger_idx != cache_get(session_id, CACHE_KEYS["task_id"]):
+            return False
+
+        cache_set(fig, session_id, CACHE_KEYS["figure"], str(slider_arg))
+        cache_set(hover_data, session_id, CACHE_KEYS["hover"], str(slider_arg))
+        cache_set(ref_fig, session_id, CACHE_KEYS["figure_ref"], str(slider_arg))
+        cache_set(
+            fig_kwargs["image"], session_id, CACHE_KEYS["figure_image"], str(slider_arg)
+        )
+
+    return True
+
+
 def get_scatter_3d_view_callbacks(app):
     """
     Register the callback functions for the 3D view.
@@ -333,7 +536,6 @@ def get_scatter_3d_view_callbacks(app):
             "darkmode": State("darkmode-switch", "value"),
             "session_id": State("session-id", "data"),
             "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         prevent_initial_call=True,
     )
@@ -351,7 +553,6 @@ def get_scatter_3d_view_callbacks(app):
         darkmode,
         session_id,
         file,
-        file_list,
     ):
         """
         Callback function for the slider change event.
@@ -370,7 +571,6 @@ def get_scatter_3d_view_callbacks(app):
         - darkmode (bool): Whether dark mode is enabled or not.
         - session_id (str): The ID of the current session.
         - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: A dictionary containing the updated 3D scatter plot figure.
@@ -398,8 +598,6 @@ def get_scatter_3d_view_callbacks(app):
                 visible_list,
                 c_key,
                 session_id,
-                file,
-                file_list,
                 ispaused,
             )
         else:
@@ -417,10 +615,8 @@ def get_scatter_3d_view_callbacks(app):
                             session_id, CACHE_KEYS["hover"], str(slider_arg)
                         )
 
-                        if hover_list:
-                            for idx, hover_str in enumerate(hover_list):
-                                fig[idx]["text"] = hover_str
-                                fig[idx]["hovertemplate"] = "%{text}"
+                        for idx, hover_props in enumerate(hover_list):
+                            fig[idx].update(hover_props)
 
                     if c_type == "numerical":
                         if "marker" in fig[0]:
@@ -442,10 +638,8 @@ def get_scatter_3d_view_callbacks(app):
                                         str(slider_arg - val),
                                     )
 
-                                    if hover_list:
-                                        for idx, hover_str in enumerate(hover_list):
-                                            new_fig[idx]["text"] = hover_str
-                                            new_fig[idx]["hovertemplate"] = "%{text}"
+                                    for idx, hover_props in enumerate(hover_list):
+                                        new_fig[idx].update(hover_props)
 
                                 if c_type == "numerical":
                                     if "marker" in new_fig[0]:
@@ -456,10 +650,19 @@ def get_scatter_3d_view_callbacks(app):
                     fig_ref = cache_get(
                         session_id, CACHE_KEYS["figure_ref"], str(slider_arg)
                     )
-                    layout = cache_get(
-                        session_id, CACHE_KEYS["figure_layout"], str(slider_arg)
+                    images = get_scatter3d_images(
+                        cache_get(
+                            session_id, CACHE_KEYS["figure_image"], str(slider_arg)
+                        )
                     )
 
+                    if trigger_id == "slider-frame":
+                        return {"scatter3d": get_frame_patch(fig_ref + fig, images)}
+
+                    # the layout is shared by all the buffered frames
+                    layout = cache_get(session_id, CACHE_KEYS["figure_layout"])
+                    layout["images"] = images
+
                     if darkmode:
                         layout["template"] = pio.templates["plotly_dark"]
                     else:
@@ -480,6 +683,11 @@ def get_scatter_3d_view_callbacks(app):
                 ispaused,
             )
 
+            if trigger_id == "slider-frame":
+                return {
+                    "scatter3d": get_frame_patch(fig["data"], fig["layout"]["images"])
+                }
+
         if darkmode:
             fig["layout"]["template"] = pio.templates["plotly_dark"]
         else:
@@ -487,69 +695,148 @@ def get_scatter_3d_view_callbacks(app):
 
         return {"scatter3d": fig}
 
-    @app.callback(
-        output={
-            "scatter3d": Output("scatter3d", "figure", allow_duplicate=True),
-        },
-        inputs={
-            "colormap": Input("colormap-3d", "value"),
-        },
-        state={
-            "fig": State("scatter3d", "figure"),
-        },
+    # The colormap and the dark mode are switched in the browser with a
+    # partial update of the figure, the points are not sent to the server
+    # and back.
+    app.clientside_callback(
+        """
+        function(colormap, fig) {
+            if (!fig || !fig.data) {
+                return window.dash_clientside.no_update;
+            }
+            const patch = new window.dash_clientside.Patch();
+            fig.data.forEach((trace, idx) => {
+                if (trace.marker) {
+                    patch.assign(["data", idx, "marker", "colorscale"], colormap);
+                }
+            });
+            return patch.build();
+        }
+        """,
+        Output("scatter3d", "figure", allow_duplicate=True),
+        Input("colormap-3d", "value"),
+        State("scatter3d", "figure"),
         prevent_initial_call=True,
     )
-    def colormap_change_callback(colormap, fig):
-        """
-        Callback function for the colormap change event.
-
-        Parameters:
-        - colormap (str): The selected colormap.
-        - fig (dict): The current 3D scatter plot figure.
-
-        Returns:
-        - dict: A dictionary containing the updated 3D scatter plot figure.
 
-        Output Properties:
-        - scatter3d (dict): The updated 3D scatter plot figure.
+    app.clientside_callback(
         """
-        for idx in range(0, len(fig["data"])):
-            fig["data"][idx]["marker"]["colorscale"] = colormap
+        function(darkmode, templates) {
+            const patch = new window.dash_clientside.Patch();
+            patch.assign(
+                ["layout", "template"],
+                templates[darkmode ? "plotly_dark" : "plotly"]
+            );
+            return patch.build();
+        }
+        """,
+        Output("scatter3d", "figure", allow_duplicate=True),
+        Input("darkmode-switch", "value"),
+        State("figure-templates", "data"),
+        prevent_initial_call=True,
+    )
 
-        return {"scatter3d": fig}
+    # The playback in the browser, see `assets/playback.js`. The browser
+    # advances the frames itself and asks the server for the next buffered
+    # frames when its window runs low.
+    app.clientside_callback(
+        ClientsideFunction(namespace="playback", function_name="control"),
+        Output("playback-request", "data"),
+        Input("play-button", "n_clicks"),
+        Input("stop-button", "n_clicks"),
+        Input("slider-frame", "value"),
+        Input("background-trigger", "data"),
+        State("browser-playback-switch", "value"),
+        State("overlay-switch", "value"),
+        State("slider-frame", "max"),
+        State("decay-slider", "value"),
+        State("playback-settings", "data"),
+        prevent_initial_call=True,
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="playback", function_name="receive"),
+        Output("playback-request", "data", allow_duplicate=True),
+        Input("playback-frames", "data"),
+        prevent_initial_call=True,
+    )
 
     @app.callback(
-        output={
-            "scatter3d": Output("scatter3d", "figure", allow_duplicate=True),
-        },
-        inputs={
-            "darkmode": Input("darkmode-switch", "value"),
-        },
+        output={"frames": Output("playback-frames", "data")},
+        inputs={"request": Input("playback-request", "data")},
         state={
-            "fig": State("scatter3d", "figure"),
+            "colormap": State("colormap-3d", "value"),
+            "c_key": State("c-picker-3d", "value"),
+            "session_id": State("session-id", "data"),
         },
         prevent_initial_call=True,
     )
-    def darkmode_change_callback(darkmode, fig):
+    def playback_request_callback(request, colormap, c_key, session_id):
         """
-        Callback function for the dark mode change event.
+        Callback function to send the next buffered frames to the playback
+        in the browser.
 
         Parameters:
-        - darkmode (bool): Whether dark mode is enabled or not.
-        - fig (dict): The current 3D scatter plot figure.
+        - request (dict): The request of the browser, with the index of the
+            first frame `start`, the number of frames `count` and the
+            request `id`.
+        - colormap (str): The selected colormap.
+        - c_key (str): The selected color key.
+        - session_id (str): The ID of the current session.
 
         Returns:
-        - dict: A dictionary containing the updated 3D scatter plot figure.
+        - dict: A dictionary containing the frames.
 
         Output Properties:
-        - scatter3d (dict): The updated 3D scatter plot figure.
+        - frames (dict): The request `id` and `count`, and the `frames`, each
+            with its `index`, its traces `data`, its reference traces `ref`
+            and its layout `images`. Only the frames that are already
+            buffered are sent.
         """
-        if darkmode:
-            fig["layout"]["template"] = pio.templates["plotly_dark"]
-        else:
-            fig["layout"]["template"] = pio.templates["plotly"]
+        if request is None:
+            raise PreventUpdate
 
-        return {"scatter3d": fig}
+        config = cache_get(session_id, CACHE_KEYS["config"])
+        c_type = config["keys"][c_key].get("type", KEY_TYPES["NUM"])
+        frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
+        fig_idx = cache_get(session_id, CACHE_KEYS["figure_idx"])
+
+        frames = []
+        for val in range(0, request["count"]):
+            frame_idx = (request["start"] + val) % len(frame_list)
+            if fig_idx is None or frame_idx > fig_idx:
+                break
+
+            fig = cache_get(session_id, CACHE_KEYS["figure"], str(frame_idx))
+            if fig is None:
+                break
+
+            if c_type == "numerical":
+                if "marker" in fig[0]:
+                    fig[0]["marker"]["colorscale"] = colormap
+
+            frames.append(
+                {
+                    "index": frame_idx,
+                    "data": fig,
+                    "ref": cache_get(
+                        session_id, CACHE_KEYS["figure_ref"], str(frame_idx)
+                    ),
+                    "images": get_scatter3d_images(
+                        cache_get(
+                            session_id, CACHE_KEYS["figure_image"], str(frame_idx)
+                        )
+                    ),
+                }
+            )
+
+        return {
+            "frames": {
+                "id": request["id"],
+                "count": request["count"],
+                "frames": frames,
+            }
+        }
 
     @app.callback(
         output={
@@ -586,14 +873,8 @@ def get_scatter_3d_view_callbacks(app):
         Output Properties:
         - trigger (int): The updated trigger value.
         """
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
         if click_hide:
-            if visible_table["_VIS_"][click_data["points"][0]["id"]] == "visible":
-                visible_table.at[click_data["points"][0]["id"], "_VIS_"] = "hidden"
-            else:
-                visible_table.at[click_data["points"][0]["id"], "_VIS_"] = "visible"
-
-            cache_set(visible_table, session_id, CACHE_KEYS["visible_table"])
+            toggle_visibility(session_id, [click_data["points"][0]["id"]])
 
             return {"trigger": trigger_input + 1}
 
@@ -623,7 +904,6 @@ def get_scatter_3d_view_callbacks(app):
             "darkmode": State("darkmode-switch", "value"),
             "session_id": State("session-id", "data"),
             "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
             "trigger_val": State("background-trigger", "data"),
         },
         prevent_initial_call=True,
@@ -645,7 +925,6 @@ def get_scatter_3d_view_callbacks(app):
         darkmode,
         session_id,
         file,
-        file_list,
         trigger_val,
     ):
         """
@@ -667,7 +946,6 @@ def get_scatter_3d_view_callbacks(app):
         - darkmode (bool): Whether dark mode is enabled or not.
         - session_id (str): The ID of the current session.
         - file (str): The selected file.
-        - file_list (list): The list of selected files.
         - trigger_val (int): The trigger value.
 
         Returns:
@@ -686,9 +964,6 @@ def get_scatter_3d_view_callbacks(app):
         filter_kwargs["cat_values"] = cat_values
         cache_set(filter_kwargs, session_id, CACHE_KEYS["filter_kwargs"])
 
-        if file not in file_list:
-            file_list.append(file)
-
         # get config from Redis
         config = cache_get(session_id, CACHE_KEYS["config"])
 
@@ -702,8 +977,6 @@ def get_scatter_3d_view_callbacks(app):
                 visible_list,
                 c_key,
                 session_id,
-                file,
-                file_list,
                 ispaused,
             )
         else:
@@ -801,99 +1074,81 @@ def get_scatter_3d_view_callbacks(app):
         cache_set(-1, session_id, CACHE_KEYS["figure_idx"])
 
         config = cache_get(session_id, CACHE_KEYS["config"])
-        keys_dict = config["keys"]
-
-        slider_label = keys_dict[config["slider"]]["description"]
-
-        filter_kwargs = cache_get(session_id, CACHE_KEYS["filter_kwargs"])
-        cat_keys = filter_kwargs["cat_keys"]
-        num_keys = filter_kwargs["num_keys"]
-
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
         frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
 
-        dataset = load_data(file_list)
-        frame_group = dataset.groupby(config["slider"])
-
-        # prepare figure key word arguments
+        # the layout is the same for all the frames, only the images differ,
+        # they are buffered with the frames
+        filter_kwargs = cache_get(session_id, CACHE_KEYS["filter_kwargs"])
         fig_kwargs = prepare_figure_kwargs(
             config,
             frame_list,
             c_key,
-            num_keys,
+            filter_kwargs["num_keys"],
             num_values,
         )
+        cache_set(
+            get_scatter3d_layout(**fig_kwargs),
+            session_id,
+            CACHE_KEYS["figure_layout"],
+        )
 
-        for slider_arg, frame_idx in enumerate(frame_list):
-            file = json.loads(file_list[0])
-            img_path = os.path.join(
-                file["path"], file["name"][0:-4], str(frame_list[slider_arg]) + ".jpg"
-            )
-
-            # encode image frame
-            fig_kwargs["image"] = load_image(img_path)
-
-            fig_kwargs["name"] = (
-                "Index: "
-                + str(slider_arg)
-                + " ("
-                + slider_label
-                + ": "
-                + str(frame_idx)
-                + ")"
-            )
-
-            data = frame_group.get_group(frame_idx)
-            filterd_frame = filter_all(
-                data,
-                num_keys,
-                num_values,
-                cat_keys,
-                cat_values,
-                visible_table,
-                visible_list,
-            )
-
-            fig = get_scatter3d_data(filterd_frame, **fig_kwargs)
-
-            hover_strings = get_hover_strings(
-                filterd_frame, fig_kwargs["c_key"], fig_kwargs["c_type"], keys_dict
-            )
-            if fig_kwargs["x_ref"] is not None and fig_kwargs["y_ref"] is not None:
-                ref_fig = [
-                    get_ref_scatter3d_data(
-                        data_frame=filterd_frame,
-                        x_key=fig_kwargs["x_ref"],
-                        y_key=fig_kwargs["y_ref"],
-                        z_key=None,
-                        name=fig_kwargs.get("ref_name", None),
-                    )
-                ]
-            else:
-                ref_fig = []
-
-            fig_layout = get_scatter3d_layout(**fig_kwargs)
-
-            if trigger_idx != cache_get(session_id, CACHE_KEYS["task_id"]):
-                print("task (" + str(trigger_idx) + ") cancelled")
-                set_progress([0, "Buffering ... (0 %)"])
-                return {"dummy": 0}
+        # format the hover text of the dataset before the workers start
+        if not HOVER_TEMPLATE:
+            get_hover_table(session_id, config["keys"])
 
-            cache_set(slider_arg, session_id, CACHE_KEYS["figure_idx"])
-            cache_set(fig, session_id, CACHE_KEYS["figure"], str(slider_arg))
-            cache_set(hover_strings, session_id, CACHE_KEYS["hover"], str(slider_arg))
-            cache_set(ref_fig, session_id, CACHE_KEYS["figure_ref"], str(slider_arg))
-            cache_set(
-                fig_layout, session_id, CACHE_KEYS["figure_layout"], str(slider_arg)
+        # split the frames into chunks, the chunks are built in parallel and
+        # published in order, so that the buffered frames are always
+        # `0 ... figure_idx`
+        chunk_list = [
+            (start, min(start + BUFFER_CHUNK_SIZE, len(frame_list)))
+            for start in range(0, len(frame_list), BUFFER_CHUNK_SIZE)
+        ]
+        buffer_kwargs = {
+            "trigger_idx": trigger_idx,
+            "config": config,
+            "cat_values": cat_values,
+            "num_values": num_values,
+            "visible_list": visible_list,
+            "c_key": c_key,
+            "session_id": session_id,
+            "file": file_list[0],
+        }
+
+        if BUFFER_WORKERS > 1 and len(chunk_list) > 1:
+            pool = ProcessPoolExecutor(max_workers=min(BUFFER_WORKERS, len(chunk_list)))
+            future_list = [
+                pool.submit(build_frame_buffer, frame_range, **buffer_kwargs)
+                for frame_range in chunk_list
+            ]
+            result_list = (future.result() for future in future_list)
+        else:
+            pool = None
+            result_list = (
+                build_frame_buffer(frame_range, **buffer_kwargs)
+                for frame_range in chunk_list
             )
 
-            percent = slider_arg / len(frame_list) * 100
-            set_progress(
-                [
-                    percent,
-                    "Buffering ... (" + str(round(percent, 2)) + " %)",
-                ]
-            )
+        try:
+            for frame_range, completed in zip(chunk_list, result_list):
+                if not completed or trigger_idx != cache_get(
+                    session_id, CACHE_KEYS["task_id"]
+                ):
+                    print("task (" + str(trigger_idx) + ") cancelled")
+                    set_progress([0, "Buffering ... (0 %)"])
+                    return {"dummy": 0}
+
+                cache_set(frame_range[1] - 1, session_id, CACHE_KEYS["figure_idx"])
+
+                percent = frame_range[1] / len(frame_list) * 100
+                set_progress(
+                    [
+                        percent,
+                        "Buffering ... (" + str(round(percent, 2)) + " %)",
+                    ]
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
 
         set_progress([100, "Buffer ready (100 %)"])
 
@@ -1031,17 +1286,15 @@ def get_scatter_3d_view_callbacks(app):
         if file not in file_list:
             file_list.append(file)
 
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-
-        dataset = load_data(file_list)
+        dataset = load_dataset(session_id)
         filtered_table = filter_all(
             dataset,
             num_keys,
             num_values,
             cat_keys,
             cat_values,
-            visible_table,
-            visible_list,
+            visible_list=visible_list,
+            session_id=session_id,
         )
 
         img_list = []
@@ -1168,11 +1421,10 @@ def get_scatter_3d_view_callbacks(app):
             "session_id": State("session-id", "data"),
             "visible_list": State("visible-picker", "value"),
             "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         prevent_initial_call=True,
     )
-    def export_all_frame_data(btn, session_id, visible_list, file, file_list):
+    def export_all_frame_data(btn, session_id, visible_list, file):
         """
         Callback function for exporting filtered data.
 
@@ -1181,7 +1433,6 @@ def get_scatter_3d_view_callbacks(app):
         - session_id (str): The ID of the current session.
         - visible_list (list): The list of visible items.
         - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: A dictionary containing a dummy output.
@@ -1198,18 +1449,15 @@ def get_scatter_3d_view_callbacks(app):
         cat_values = filter_kwargs["cat_values"]
         num_values = filter_kwargs["num_values"]
 
-        # file = json.loads(file)
-        data = load_data(file_list, file)
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-
+        data = load_dataset(session_id)
         filtered_table = filter_all(
             data,
             num_keys,
             num_values,
             cat_keys,
             cat_values,
-            visible_table,
-            visible_list,
+            visible_list=visible_list,
+            session_id=session_id,
         )
         file = json.loads(file)
 
@@ -1261,21 +1509,15 @@ def get_scatter_3d_view_callbacks(app):
         cat_values = filter_kwargs["cat_values"]
         num_values = filter_kwargs["num_values"]
 
-        # file = json.loads(file)
-        frame_list = cache_get(session_id, CACHE_KEYS["frame_list"])
-        data = cache_get(
-            session_id, CACHE_KEYS["frame_data"], str(frame_list[slider_arg])
-        )
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-
+        data = load_frame(session_id, slider_arg)
         filtered_table = filter_all(
             data,
             num_keys,
             num_values,
             cat_keys,
             cat_values,
-            visible_table,
-            visible_list,
+            visible_list=visible_list,
+            session_id=session_id,
         )
         file = json.loads(file)
 
@@ -29,8 +29,8 @@
 
 import os
 
-import pandas as pd
 import numpy as np
+import pyarrow.compute as pc
 
 import dash
 from dash import dcc
@@ -50,7 +50,73 @@ from app_config import background_callback_manager
 from app_config import CACHE_KEYS, KEY_TYPES, THEME
 
 from utils import load_config, cache_set, cache_get
-from utils import load_data
+from utils import load_data, save_dataset, init_visibility, drop_filtered_frames
+
+
+def allow_duplicate(outputs):
+    """
+    Get a copy of a list of outputs that can be shared with other callbacks.
+
+    Parameters:
+    - outputs (list): List of `Output`.
+
+    Returns:
+    - list: List of `Output` with `allow_duplicate`.
+    """
+    return [
+        Output(item.component_id, item.component_property, allow_duplicate=True)
+        for item in outputs
+    ]
+
+
+def get_filter_layout(keys_dict, filter_kwargs):
+    """
+    Create the filter components of a dataset.
+
+    Parameters:
+    - keys_dict (dict): The keys of the test case configuration.
+    - filter_kwargs (dict): The keys of the dataset and their categorical
+        and numerical values.
+
+    Returns:
+    - tuple: The dropdown components for the categorical values and the
+        slider components for the numerical values.
+    """
+    new_dropdown = []
+    for idx, d_item in enumerate(filter_kwargs["cat_keys"]):
+        var_list = filter_kwargs["cat_values"][idx]
+
+        new_dropdown.append(dbc.Label(keys_dict[d_item]["description"]))
+        new_dropdown.append(
+            html.Div(
+                dcc.Dropdown(
+                    id={"type": "filter-dropdown", "index": idx},
+                    options=[{"label": i, "value": i} for i in var_list],
+                    value=var_list,
+                    multi=True,
+                ),
+                className=THEME,
+            )
+        )
+
+    new_slider = []
+    for idx, item in enumerate(filter_kwargs["num_keys"]):
+        var_min, var_max = filter_kwargs["num_values"][idx]
+
+        new_slider.append(dbc.Label(keys_dict[item]["description"]))
+        new_slider.append(
+            dcc.RangeSlider(
+                id={"type": "filter-slider", "index": idx},
+                min=var_min,
+                max=var_max,
+                marks=None,
+                step=round((var_max - var_min) / 100, 3),
+                value=[var_min, var_max],
+                tooltip={"always_visible": False},
+            )
+        )
+
+    return new_dropdown, new_slider
 
 
 def get_test_case_view_callbacks(app):
@@ -95,6 +161,7 @@ def get_test_case_view_callbacks(app):
         },
         progress=[
             Output("loading-view", "style"),
+            Output("loading-text", "children"),
         ],
         manager=background_callback_manager,
     )
@@ -143,18 +210,15 @@ def get_test_case_view_callbacks(app):
         if not file:
             raise PreventUpdate
 
-        set_progress(
-            [
-                {
-                    "position": "fixed",
-                    "top": 0,
-                    "left": 0,
-                    "width": "100%",
-                    "height": "100%",
-                    "background-color": "rgba(0, 0, 0, 0.9)",
-                },
-            ]
-        )
+        loading_style = {
+            "position": "fixed",
+            "top": 0,
+            "left": 0,
+            "width": "100%",
+            "height": "100%",
+            "background-color": "rgba(0, 0, 0, 0.9)",
+        }
+        set_progress([loading_style, "Loading ..."])
         cache_set(-1, session_id, CACHE_KEYS["task_id"])
         cache_set(-1, session_id, CACHE_KEYS["figure_idx"])
 
@@ -222,128 +286,206 @@ def get_test_case_view_callbacks(app):
         else:
             values_cat = [cat_keys[0]] * len(DROPDOWN_VALUES_CAT)
 
-        keys_dict = config["keys"]
-
-        new_data = load_data(add_file_value, file)
-        # get the list of frames and save to Cache
-        frame_list = np.sort(new_data[config["slider"]].unique())
-        cache_set(frame_list, session_id, CACHE_KEYS["frame_list"])
-
-        # create the visibility table and save to Cache
-        #   the visibility table is used to indicate if the data point is
-        #   `visible` or `hidden`
-        visible_table = pd.DataFrame()
-        visible_table["_IDS_"] = new_data.index
-        visible_table["_VIS_"] = "visible"
-        cache_set(visible_table, session_id, CACHE_KEYS["visible_table"])
-
-        # group the DataFrame by frame and save the grouped data one by one
-        # into Cache
-        frame_group = new_data.groupby(config["slider"])
-        for frame_idx, frame_data in frame_group:
-            cache_set(frame_data, session_id, CACHE_KEYS["frame_data"], str(frame_idx))
-
-        # create dropdown layouts
-        # obtain categorical values
-        cat_values = []
-        new_dropdown = []
-        for idx, d_item in enumerate(cat_keys):
-            if d_item in new_data.columns:
-                var_list = new_data[d_item].unique().tolist()
-                value_list = var_list
-            else:
-                var_list = []
-                value_list = []
-
-            new_dropdown.append(dbc.Label(keys_dict[d_item]["description"]))
-            new_dropdown.append(
-                html.Div(
-                    dcc.Dropdown(
-                        id={"type": "filter-dropdown", "index": idx},
-                        options=[{"label": i, "value": i} for i in var_list],
-                        value=value_list,
-                        multi=True,
-                    ),
-                    className=THEME,
-                )
-            )
+        outputs = {
+            "stored_file": file,
+            "frame_min": 0,
+            "dim_picker_opt": [{"label": ck, "value": ck} for ck in cat_keys],
+            "dim_picker_val": [cat_keys[0] if len(cat_keys) > 0 else None],
+            "dp_opts_all": options_all,
+            "dp_vals_all": values_all,
+            "dp_opts_cat_color": options_cat_color,
+            "dp_vals_cat_color": values_cat_color,
+            "dp_opts_cat": options_cat,
+            "dp_vals_cat": values_cat,
+        }
 
-            cat_values.append(value_list)
-
-        # create slider layouts
-        # obtain numerical values
-        num_values = []
-        new_slider = []
-        for idx, item in enumerate(num_keys):
-            if item in new_data.columns:
-                # use `.tolist()` to convert numpy type ot python type
-                var_min = np.floor(np.min(new_data[item])).tolist()
-                var_max = np.ceil(np.max(new_data[item])).tolist()
-            else:
+        def publish_dataset(new_data):
+            # sort the data by frame, so that every frame is a contiguous
+            # slice of the dataset, log files are usually in order already
+            slider_values = new_data.column(config["slider"]).to_numpy()
+            if np.any(slider_values[1:] < slider_values[:-1]):
+                sort_idx = np.argsort(slider_values, kind="stable")
+                new_data = new_data.take(sort_idx)
+                slider_values = slider_values[sort_idx]
+
+            # save the dataset into the columnar store, all the other
+            # callbacks read it from there instead of re-parsing the data files
+            save_dataset(new_data, session_id)
+            drop_filtered_frames(session_id)
+
+            # get the list of frames and save to Cache
+            frame_list = np.unique(slider_values)
+            cache_set(frame_list, session_id, CACHE_KEYS["frame_list"])
+
+            # get the (start, stop) offsets of every frame and save to Cache
+            frame_index = np.stack(
+                [
+                    np.searchsorted(slider_values, frame_list, side="left"),
+                    np.searchsorted(slider_values, frame_list, side="right"),
+                ],
+                axis=1,
+            )
+            cache_set(frame_index, session_id, CACHE_KEYS["frame_index"])
+
+            # create the visibility table and save to Cache
+            #   the visibility table is used to indicate if the data point is
+            #   `visible` or `hidden`
+            init_visibility(session_id, new_data.num_rows)
+
+            # obtain categorical values
+            cat_values = []
+            for d_item in cat_keys:
+                if d_item in new_data.column_names:
+                    cat_values.append(pc.unique(new_data.column(d_item)).to_pylist())
+                else:
+                    cat_values.append([])
+
+            # obtain numerical values
+            num_values = []
+            for item in num_keys:
                 var_min = 0
                 var_max = 0
-
-            new_slider.append(dbc.Label(keys_dict[item]["description"]))
-            new_slider.append(
-                dcc.RangeSlider(
-                    id={"type": "filter-slider", "index": idx},
-                    min=var_min,
-                    max=var_max,
-                    marks=None,
-                    step=round((var_max - var_min) / 100, 3),
-                    value=[var_min, var_max],
-                    tooltip={"always_visible": False},
-                )
+                if item in new_data.column_names:
+                    min_max = pc.min_max(new_data.column(item))
+                    # a column without any value has no range, the same as a
+                    # missing key
+                    if min_max["min"].is_valid:
+                        # use `.tolist()` to convert numpy type ot python type
+                        var_min = np.floor(min_max["min"].as_py()).tolist()
+                        var_max = np.ceil(min_max["max"].as_py()).tolist()
+                num_values.append([var_min, var_max])
+
+            # save categorical values and numerical values to Cache
+            filter_kwargs["num_values"] = num_values
+            filter_kwargs["cat_values"] = cat_values
+            cache_set(filter_kwargs, session_id, CACHE_KEYS["filter_kwargs"])
+
+            return len(frame_list)
+
+        progress = {"percent": -1, "style": loading_style, "preview": False}
+
+        def loading_progress(fraction):
+            # only push an update to the browser when the percentage changes
+            percent = int(fraction * 100)
+            if percent != progress["percent"]:
+                progress["percent"] = percent
+                set_progress([progress["style"], "Loading ... " + str(percent) + " %"])
+
+        def loading_preview(new_data):
+            # publish the first chunks, so that the first frames can be
+            # viewed while the rest of the file is still loading, the
+            # complete dataset replaces them once it is loaded
+            num_frames = publish_dataset(new_data)
+            progress["preview"] = True
+            cache_set(file_loaded + 1, session_id, CACHE_KEYS["file_preview"])
+            dash.set_props(
+                "file-preview",
+                {
+                    "data": {
+                        **outputs,
+                        "file_load_trigger": file_loaded + 1,
+                        "frame_max": num_frames - 1,
+                    }
+                },
             )
 
-            num_values.append([var_min, var_max])
+            # the loading view shrinks to a banner that doesn't block the page
+            progress["style"] = {
+                **loading_style,
+                "top": "auto",
+                "bottom": 0,
+                "height": "auto",
+                "background-color": "rgba(0, 0, 0, 0.6)",
+            }
+            progress["percent"] = -1
+
+        cache_set(None, session_id, CACHE_KEYS["file_preview"])
+        new_data = load_data(
+            add_file_value, file, loading_progress, config, loading_preview
+        )
 
-        # save categorical values and numerical values to Cache
-        filter_kwargs["num_values"] = num_values
-        filter_kwargs["cat_values"] = cat_values
-        cache_set(filter_kwargs, session_id, CACHE_KEYS["filter_kwargs"])
+        set_progress([progress["style"], "Saving ..."])
+        cache_set(None, session_id, CACHE_KEYS["file_preview"])
+        num_frames = publish_dataset(new_data)
+        new_dropdown, new_slider = get_filter_layout(config["keys"], filter_kwargs)
 
-        # dimensions picker default value
-        if len(cat_keys) == 0:
-            t_values_cat = None
-        else:
-            t_values_cat = cat_keys[0]
+        set_progress([{**loading_style, "display": "none"}, "Loading ..."])
 
-        set_progress(
-            [
-                {
-                    "position": "fixed",
-                    "top": 0,
-                    "left": 0,
-                    "width": "100%",
-                    "height": "100%",
-                    "background-color": "rgba(0, 0, 0, 0.9)",
-                    "display": "none",
-                },
-            ]
-        )
+        return {
+            **outputs,
+            # the preview has already incremented the trigger once
+            "file_load_trigger": file_loaded + (2 if progress["preview"] else 1),
+            "frame_max": num_frames - 1,
+            "dropdown_container": new_dropdown,
+            "slider_container": new_slider,
+        }
+
+    @app.callback(
+        output={
+            "file_load_trigger": Output(
+                "file-loaded-trigger", "data", allow_duplicate=True
+            ),
+            "stored_file": Output("local-file-selection", "data", allow_duplicate=True),
+            "frame_min": Output("slider-frame", "min", allow_duplicate=True),
+            "frame_max": Output("slider-frame", "max", allow_duplicate=True),
+            "dropdown_container": Output(
+                "dropdown-container", "children", allow_duplicate=True
+            ),
+            "slider_container": Output(
+                "slider-container", "children", allow_duplicate=True
+            ),
+            "dim_picker_opt": Output(
+                "dim-picker-parallel", "options", allow_duplicate=True
+            ),
+            "dim_picker_val": Output(
+                "dim-picker-parallel", "value", allow_duplicate=True
+            ),
+            "dp_opts_all": allow_duplicate(DROPDOWN_OPTIONS_ALL),
+            "dp_vals_all": allow_duplicate(DROPDOWN_VALUES_ALL),
+            "dp_opts_cat_color": allow_duplicate(DROPDOWN_OPTIONS_CAT_COLOR),
+            "dp_vals_cat_color": allow_duplicate(DROPDOWN_VALUES_CAT_COLOR),
+            "dp_opts_cat": allow_duplicate(DROPDOWN_OPTIONS_CAT),
+            "dp_vals_cat": allow_duplicate(DROPDOWN_VALUES_CAT),
+        },
+        inputs={"preview": Input("file-preview", "data")},
+        state={"session_id": State("session-id", "data")},
+        prevent_initial_call=True,
+    )
+    def file_preview_changed(preview, session_id):
+        """
+        Callback when the first chunks of a file that is still loading have
+        been published.
+
+        Parameters:
+        - preview (dict): The outputs of `file_select_changed` for the
+            first chunks, without the filter components.
+        - session_id (str): Session id.
+
+        Returns:
+        dict: The same dictionary as `file_select_changed`.
+
+        Raises:
+        PreventUpdate: If the file has been completely loaded meanwhile.
+        """
+        if preview is None or preview["file_load_trigger"] != cache_get(
+            session_id, CACHE_KEYS["file_preview"]
+        ):
+            raise PreventUpdate
+
+        config = cache_get(session_id, CACHE_KEYS["config"])
+        filter_kwargs = cache_get(session_id, CACHE_KEYS["filter_kwargs"])
+        new_dropdown, new_slider = get_filter_layout(config["keys"], filter_kwargs)
 
         return {
-            "file_load_trigger": file_loaded + 1,
-            "stored_file": file,
-            "frame_min": 0,
-            "frame_max": len(frame_list) - 1,
+            **preview,
             "dropdown_container": new_dropdown,
             "slider_container": new_slider,
-            "dim_picker_opt": [{"label": ck, "value": ck} for ck in cat_keys],
-            "dim_picker_val": [t_values_cat],
-            "dp_opts_all": options_all,
-            "dp_vals_all": values_all,
-            "dp_opts_cat_color": options_cat_color,
-            "dp_vals_cat_color": values_cat_color,
-            "dp_opts_cat": options_cat,
-            "dp_vals_cat": values_cat,
         }
 
     @app.callback(
         output={"slider_value": Output("slider-frame", "value")},
         inputs={
-            "unused_file_loaded": Input("file-loaded-trigger", "data"),
+            "file_loaded": Input("file-loaded-trigger", "data"),
             "left_btn": Input("previous-button", "n_clicks"),
             "right_btn": Input("next-button", "n_clicks"),
             "interval": Input("interval-component", "n_intervals"),
@@ -353,10 +495,11 @@ def get_test_case_view_callbacks(app):
             "slider_max": State("slider-frame", "max"),
             "slider_state": State("slider-frame", "value"),
             "session_id": State("session-id", "data"),
+            "preview": State("file-preview", "data"),
         },
     )
     def update_slider(
-        unused_file_loaded,
+        file_loaded,
         left_btn,
         right_btn,
         interval,
@@ -364,12 +507,13 @@ def get_test_case_view_callbacks(app):
         slider_max,
         slider_state,
         session_id,
+        preview,
     ):
         """
         Callback for updating the slider position.
 
         Parameters:
-        - unused_file_loaded (int): Unused file load trigger count.
+        - file_loaded (int): Number of times the file has been loaded.
         - left_btn (int): Number of clicks from the next button.
         - right_btn (int): Number of clicks from the previous button.
         - interval (int): Number of intervals.
@@ -378,6 +522,7 @@ def get_test_case_view_callbacks(app):
         - slider_max (int): Maximum number of slider positions.
         - slider_state (int): Current slider position.
         - session_id (str): Session id.
+        - preview (dict): The outputs of the last file preview.
 
         Returns:
         dict: A dictionary containing the new slider value.
@@ -401,6 +546,10 @@ def get_test_case_view_callbacks(app):
         trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
 
         if trigger_id == "file-loaded-trigger":
+            if preview is not None and file_loaded == preview["file_load_trigger"] + 1:
+                # the file has been completely loaded after its preview, stay
+                # on the frame that has been picked meanwhile
+                return {"slider_value": min(slider_state, slider_max)}
             return {"slider_value": 0}
 
         if trigger_id == "previous-button":
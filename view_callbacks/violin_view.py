@@ -31,19 +31,19 @@ import os
 
 import datetime
 
-import plotly.express as px
 import plotly.graph_objs as go
 
 from dash import dcc
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
 
+from viz.viz import get_violin
+
 from app_config import background_callback_manager
 from app_config import CACHE_KEYS
 
-from utils import filter_all
 from utils import cache_get
-from utils import load_data
+from utils import load_filtered_dataset
 
 
 def get_violin_view_callbacks(app):
@@ -74,8 +74,6 @@ def get_violin_view_callbacks(app):
         state={
             "session_id": State("session-id", "data"),
             "visible_list": State("visible-picker", "value"),
-            "file": State("current-file", "data"),
-            "file_list": State("file-add", "value"),
         },
         manager=background_callback_manager,
     )
@@ -89,8 +87,6 @@ def get_violin_view_callbacks(app):
         c_violin,
         session_id,
         visible_list,
-        file,
-        file_list,
     ):
         """
         Regenerate the violin plot based on user inputs.
@@ -104,8 +100,6 @@ def get_violin_view_callbacks(app):
         - c_violin (str): The selected color key for the violin plot.
         - session_id (str): The session ID.
         - visible_list (list): The list of visible values.
-        - file (str): The selected file.
-        - file_list (list): The list of selected files.
 
         Returns:
         - dict: The output figure dictionary.
@@ -131,37 +125,25 @@ def get_violin_view_callbacks(app):
         y_key = y_violin
         y_label = config["keys"][y_violin].get("description", y_key)
 
-        data = load_data(file_list, file)
-        visible_table = cache_get(session_id, CACHE_KEYS["visible_table"])
-        filtered_table = filter_all(
-            data,
+        filtered_table = load_filtered_dataset(
+            session_id,
             num_keys,
             num_values,
             cat_keys,
             cat_values,
-            visible_table,
             visible_list,
+            [x_key, y_key] if c_violin == "None" else [x_key, y_key, c_violin],
         )
 
-        if c_violin == "None":
-            violin_fig = px.violin(
-                filtered_table,
-                x=x_key,
-                y=y_key,
-                box=True,
-                violinmode="group",
-                labels={x_key: x_label, y_key: y_label},
-            )
-        else:
-            violin_fig = px.violin(
-                filtered_table,
-                x=x_key,
-                y=y_key,
-                color=c_violin,
-                box=True,
-                violinmode="group",
-                labels={x_key: x_label, y_key: y_label},
-            )
+        # the densities and the boxes are computed on the server
+        violin_fig = get_violin(
+            filtered_table,
+            x_key,
+            y_key,
+            None if c_violin == "None" else c_violin,
+            x_label,
+            y_label,
+        )
 
         return {"violin": violin_fig}
 
@@ -27,11 +27,440 @@
 
 """
 
+import re
+import string
+import base64
+
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# format strings with a fixed number of decimals, e.g. `{:,.2f}`
+FIXED_FORMAT = re.compile(r"^\{:(,?)\.(\d+)f\}$")
+
+
+def get_typed_array(values, dtype="f4"):
+    """
+    Encode an array as a Plotly typed array.
+
+    The values are sent to the browser as base64-encoded binary data
+    instead of a JSON list of numbers.
+
+    Parameters:
+    - values (array-like): The values to encode, 1D or 2D.
+    - dtype (str): The Plotly typed array type, e.g. `f4` or `i4`.
+
+    Returns:
+    - dict: The typed array specification.
+    """
+    array = np.ascontiguousarray(values, dtype="<" + dtype)
+    typed_array = {"dtype": dtype, "bdata": base64.b64encode(array).decode()}
+    if array.ndim > 1:
+        typed_array["shape"] = ", ".join(str(size) for size in array.shape)
+
+    return typed_array
+
+
+def get_fixed_point(values, decimal):
+    """
+    Round numbers to a fixed number of decimals.
+
+    Parameters:
+    - values (np.ndarray): The numbers to round.
+    - decimal (int): The number of decimals.
+
+    Returns:
+    - tuple: The absolute values in units of the last decimal (np.ndarray),
+        and the mask of the values that are rounded exactly. The other
+        values are next to a tie, non-finite or too large.
+    """
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = np.abs(values) * 10.0**decimal
+        fraction = scaled - np.floor(scaled)
+        exact = (
+            np.isfinite(scaled)
+            & (scaled < 2**52)
+            & (np.abs(fraction - 0.5) > 2 * np.spacing(scaled))
+        )
+
+    units = np.where(exact, np.round(scaled), 0).astype(np.int64)
+    return units, exact
+
+
+def format_fixed(values, decimal, separator=""):
+    """
+    Format numbers with a fixed number of decimals, the same as
+    `"{:,.2f}".format` but vectorized.
+
+    The values whose last digit can't be rounded exactly in floating point
+    (next to a tie, non-finite or too large) are formatted with Python.
+
+    Parameters:
+    - values (np.ndarray): The numbers to format.
+    - decimal (int): The number of decimals.
+    - separator (str): The thousands separator, `,` or empty.
+
+    Returns:
+    - pa.Array: The formatted strings.
+    """
+    values = np.asarray(values, dtype=np.float64)
+
+    units, exact = get_fixed_point(values, decimal)
+    int_part = units // 10**decimal
+
+    if separator and np.any(int_part >= 1000):
+        # the highest group of digits, then the lower groups zero padded
+        num_groups = np.ones(len(int_part), dtype=np.int64)
+        while np.any(int_part >= 1000**num_groups):
+            num_groups += int_part >= 1000**num_groups
+
+        text = pc.cast(pa.array(int_part // 1000 ** (num_groups - 1)), pa.string())
+        for group_idx in range(int(np.max(num_groups)) - 2, -1, -1):
+            group = pc.utf8_lpad(
+                pc.cast(pa.array(int_part // 1000**group_idx % 1000), pa.string()),
+                width=3,
+                padding="0",
+            )
+            text = pc.if_else(
+                pa.array(num_groups - 1 > group_idx),
+                pc.binary_join_element_wise(text, group, separator),
+                text,
+            )
+    else:
+        text = pc.cast(pa.array(int_part), pa.string())
+
+    # join the sign, the integer part and the decimals in one pass
+    text_list = [text]
+    if np.any(np.signbit(values)):
+        text_list.insert(0, pc.if_else(pa.array(np.signbit(values)), "-", ""))
+    if decimal > 0:
+        fraction_text = pc.utf8_lpad(
+            pc.cast(pa.array(units % 10**decimal), pa.string()),
+            width=decimal,
+            padding="0",
+        )
+        text_list += [".", fraction_text]
+
+    if len(text_list) > 1:
+        text = pc.binary_join_element_wise(*text_list, "")
+
+    if not np.all(exact):
+        format_str = "{:" + separator + "." + str(decimal) + "f}"
+        text = pc.replace_with_mask(
+            text,
+            pa.array(~exact),
+            pa.array([format_str.format(val) for val in values[~exact].tolist()]),
+        )
+
+    return text
+
+
+def format_column(column, hover_item):
+    """
+    Format a column for the hover text.
+
+    Parameters:
+    - column (pd.Series): The column to format.
+    - hover_item (dict): The hover description and format of the column.
+
+    Returns:
+    - pa.Array: The formatted strings.
+    """
+    if "format" in hover_item:
+        format_str = hover_item["format"]
+    elif "decimal" in hover_item:
+        format_str = "{:,." + str(hover_item["decimal"]) + "f}"
+    else:
+        format_str = None
+
+    if format_str is None:
+        if pd.api.types.is_integer_dtype(column.dtype):
+            return pc.cast(pa.array(column.to_numpy()), pa.string())
+
+        formatter = str
+    else:
+        fixed = FIXED_FORMAT.match(format_str)
+        if fixed is not None and pd.api.types.is_numeric_dtype(column.dtype):
+            return format_fixed(
+                column.to_numpy(dtype=np.float64, na_value=np.nan),
+                int(fixed.group(2)),
+                fixed.group(1),
+            )
+
+        formatter = format_str.format
+
+    # format every distinct value only once
+    if pd.api.types.is_float_dtype(column.dtype):
+        # compare the bits, `0.0` and `-0.0` are formatted differently
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        codes, uniques = pd.factorize(values.view(np.int64))
+        uniques = uniques.view(np.float64)
+    else:
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+
+    strings = pa.array([formatter(val) for val in uniques.tolist()], pa.string())
+    return strings.take(pa.array(codes))
+
+
+def get_hover_text(data_frame, hover):
+    """
+    Generate the hover text of every row of the data frame.
+
+    Every column is formatted in one vectorized pass, and the columns are
+    joined into the hover text in a single pass.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - hover (dict): The dictionary specifying the hover descriptions and formats.
+
+    Returns:
+    - np.ndarray: The hover text of every row.
+    """
+    rows = len(data_frame.index)
+
+    text_list = []
+    for _, key in enumerate(hover):
+        if key not in data_frame.columns:
+            continue
+
+        text_list += [
+            hover[key]["description"] + ": ",
+            format_column(data_frame[key], hover[key]),
+            "<br>",
+        ]
+
+    if not text_list or rows == 0:
+        return np.full(rows, "", dtype=object)
+
+    hover_text = pc.binary_join_element_wise(*text_list, "")
+    return hover_text.to_numpy(zero_copy_only=False)
+
+
+def get_category_groups(column):
+    """
+    Group the rows by category in one pass.
+
+    The categories are in the order of appearance, the same as
+    `pd.unique`. Missing values never match a category, same as an `==`
+    comparison, so their group is empty.
+
+    Parameters:
+    - column (pd.Series): The categorical column.
+
+    Returns:
+    - tuple: The categories (np.ndarray), and the row positions of every
+        category (list of np.ndarray).
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=len(uniques))
+    if len(uniques) == 0:
+        return np.asarray(uniques), []
+
+    groups = np.split(order, np.cumsum(counts)[:-1])
+    for c_idx, c_item in enumerate(uniques):
+        if pd.isna(c_item):
+            groups[c_idx] = order[:0]
+
+    return np.asarray(uniques), groups
+
+
+def get_d3_format(column, hover_item):
+    """
+    Convert the hover format of a column into a d3 format of Plotly.
+
+    Only the formats that Plotly renders exactly the same as Python are
+    converted, for the values of this column.
+
+    Parameters:
+    - column (pd.Series): The column to format.
+    - hover_item (dict): The hover description and format of the column.
+
+    Returns:
+    - tuple: The text before the value, the d3 format and the text after
+        the value, or None if the values can't be formatted by Plotly.
+    """
+    if pd.api.types.is_bool_dtype(column.dtype) or not (
+        pd.api.types.is_numeric_dtype(column.dtype)
+    ):
+        return None
+
+    if "format" in hover_item:
+        format_str = hover_item["format"]
+    elif "decimal" in hover_item:
+        format_str = "{:,." + str(hover_item["decimal"]) + "f}"
+    else:
+        format_str = "{}"
+
+    try:
+        parsed = list(string.Formatter().parse(format_str))
+    except ValueError:
+        return None
+
+    fields = [item for item in parsed if item[1] is not None]
+    if len(fields) != 1 or fields[0][1] not in ("", "0") or fields[0][3]:
+        return None
+
+    prefix = "".join(item[0] for item in parsed[: parsed.index(fields[0]) + 1])
+    suffix = "".join(item[0] for item in parsed[parsed.index(fields[0]) + 1 :])
+    if "%{" in prefix + suffix:
+        return None
+
+    spec = fields[0][2]
+    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    fixed = re.match(r"^(,?)\.(\d+)f$", spec)
+    if fixed is not None:
+        # Plotly drops the sign of the values that are rounded to zero, and
+        # breaks the ties differently
+        units, exact = get_fixed_point(values, int(fixed.group(2)))
+        if not np.all(exact) or np.any(np.signbit(values) & (units == 0)):
+            return None
+
+        return prefix, spec, suffix
+
+    if spec in ("", "d", ",", ",d") and pd.api.types.is_integer_dtype(column.dtype):
+        if np.any(np.abs(values) >= 2**53):
+            return None
+
+        return prefix, ",d" if "," in spec else "d", suffix
+
+    return None
+
+
+def get_hover_template(data_frame, hover, groups):
+    """
+    Generate the hover templates of the traces, which render the same
+    hover text as `get_hover_text` in the browser.
+
+    The numerical values are sent as `customdata` and formatted by Plotly.
+    The other values are sent as `text` or `hovertext`, or written into the
+    template if they are the same for the whole trace.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - hover (dict): The dictionary specifying the hover descriptions and formats.
+    - groups (list): The row positions of every trace.
+
+    Returns:
+    - list: The hover properties of every trace, None for the traces whose
+        hover text can't be rendered by a hover template.
+    """
+    # the formats are decided once for all the traces
+    columns = []
+    customdata = []
+    for _, key in enumerate(hover):
+        if key not in data_frame.columns:
+            continue
+
+        d3_format = get_d3_format(data_frame[key], hover[key])
+        if d3_format is not None:
+            columns.append((key, len(customdata), d3_format))
+            customdata.append(data_frame[key].to_numpy(dtype=np.float64))
+        else:
+            columns.append((key, None, format_column(data_frame[key], hover[key])))
+
+    if customdata:
+        customdata = np.column_stack(customdata)
+
+    hover_data = []
+    for rows in groups:
+        template = ""
+        hover_props = {}
+        text_slots = ["text", "hovertext"]
+        for key, data_idx, data_format in columns:
+            template += hover[key]["description"] + ": "
+
+            if data_idx is not None:
+                template += (
+                    data_format[0]
+                    + "%{customdata["
+                    + str(data_idx)
+                    + "]:"
+                    + data_format[1]
+                    + "}"
+                    + data_format[2]
+                )
+            else:
+                text = data_format.take(rows)
+                if len(text) > 0 and pc.count_distinct(text).as_py() == 1:
+                    if "%{" in text[0].as_py():
+                        hover_props = None
+                        break
+
+                    template += text[0].as_py()
+                elif text_slots:
+                    slot = text_slots.pop(0)
+                    hover_props[slot] = text.to_numpy(zero_copy_only=False)
+                    template += "%{" + slot + "}"
+                else:
+                    hover_props = None
+                    break
+
+            template += "<br>"
+
+        if hover_props is not None:
+            if len(customdata) > 0:
+                hover_props["customdata"] = get_typed_array(customdata[rows], "f8")
+            hover_props["hovertemplate"] = template
+
+        hover_data.append(hover_props)
+
+    return hover_data
+
+
+def get_hover_data(
+    data_frame, c_key, c_type, hover, hover_text=None, template=False, c_groups=None
+):
+    """
+    Generate the hover properties of the traces of `get_scatter3d_data`.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - c_key (str): The key for the color data.
+    - c_type (str): The type of the color data.
+    - hover (dict): The dictionary specifying the hover descriptions and formats.
+    - hover_text (np.ndarray, optional): The preformatted hover text of
+        every row, see `get_hover_text`. Defaults to None.
+    - template (bool, optional): Render the hover text in the browser with
+        a hover template where possible, see `get_hover_template`.
+        Defaults to False.
+    - c_groups (tuple, optional): The categories and their row positions,
+        see `get_category_groups`. Defaults to None.
+
+    Returns:
+    - list: The hover properties of every trace.
+    """
+    hover_data = []
+    if hover is None:
+        return hover_data
+
+    if c_type == "categorical":
+        if c_groups is None:
+            c_groups = get_category_groups(data_frame[c_key])
+        groups = c_groups[1]
+    else:
+        groups = [np.arange(len(data_frame.index))]
+
+    if template:
+        template_data = get_hover_template(data_frame, hover, groups)
+    else:
+        template_data = [None] * len(groups)
+
+    for rows, hover_props in zip(groups, template_data):
+        if hover_props is None:
+            if hover_text is None:
+                hover_text = get_hover_text(data_frame, hover)
+
+            hover_props = {"text": hover_text[rows], "hovertemplate": "%{text}"}
 
+        hover_data.append(hover_props)
 
-def get_hover_strings(data_frame, c_key, c_type, hover):
+    return hover_data
+
+
+def get_hover_strings(data_frame, c_key, c_type, hover, hover_text=None, c_groups=None):
     """
     Generate the hover strings for the data frame.
 
@@ -40,6 +469,10 @@ def get_hover_strings(data_frame, c_key, c_type, hover):
     - c_key (str): The key for the color data.
     - c_type (str): The type of the color data.
     - hover (dict): The dictionary specifying the hover descriptions and formats.
+    - hover_text (np.ndarray, optional): The preformatted hover text of
+        every row, see `get_hover_text`. Defaults to None.
+    - c_groups (tuple, optional): The categories and their row positions,
+        see `get_category_groups`. Defaults to None.
 
     Returns:
     - list: The list of hover strings.
@@ -48,76 +481,16 @@ def get_hover_strings(data_frame, c_key, c_type, hover):
     if hover is None:
         return hover_str_list
 
-    if c_type == "numerical":
-        rows = len(data_frame.index)
-        hover_str = np.full(rows, "", dtype=object)
-        for _, key in enumerate(hover):
-            if key not in data_frame.columns:
-                continue
+    if hover_text is None:
+        hover_text = get_hover_text(data_frame, hover)
 
-            if "format" in hover[key]:
-                hover_str = (
-                    hover_str
-                    + hover[key]["description"]
-                    + ": "
-                    + data_frame[key].map(hover[key]["format"].format)
-                    + "<br>"
-                )
-            elif "decimal" in hover[key]:
-                format_str = "{:,."+str(hover[key]["decimal"])+"f}"
-                hover_str = (
-                    hover_str
-                    + hover[key]["description"]
-                    + ": "
-                    + data_frame[key].map(format_str.format)
-                    + "<br>"
-                )
-            else:
-                hover_str = (
-                    hover_str
-                    + hover[key]["description"]
-                    + ": "
-                    + data_frame[key].apply(str)
-                    + "<br>"
-                )
-        hover_str_list.append(hover_str)
+    if c_type == "numerical":
+        hover_str_list.append(hover_text)
 
     elif c_type == "categorical":
-        color_list = pd.unique(data_frame[c_key])
-
-        for c_item in color_list:
-            new_list = data_frame[data_frame[c_key] == c_item]
-
-            rows = len(new_list.index)
-            hover_str = np.full(rows, "", dtype=object)
-            for _, key in enumerate(hover):
-                if "format" in hover[key]:
-                    hover_str = (
-                        hover_str
-                        + hover[key]["description"]
-                        + ": "
-                        + new_list[key].map(hover[key]["format"].format)
-                        + "<br>"
-                    )
-                elif "decimal" in hover[key]:
-                    format_str = "{:,."+str(hover[key]["decimal"])+"f}"
-                    hover_str = (
-                        hover_str
-                        + hover[key]["description"]
-                        + ": "
-                        + new_list[key].map(format_str.format)
-                        + "<br>"
-                    )
-                else:
-                    hover_str = (
-                        hover_str
-                        + hover[key]["description"]
-                        + ": "
-                        + new_list[key].apply(str)
-                        + "<br>"
-                    )
-
-            hover_str_list.append(hover_str)
+        if c_groups is None:
+            c_groups = get_category_groups(data_frame[c_key])
+        hover_str_list = [hover_text[rows] for rows in c_groups[1]]
 
     return hover_str_list
 
@@ -132,7 +505,9 @@ def get_scatter3d_data(data_frame, x_key, y_key, z_key, c_key, **kwargs):
     - y_key (str): The key for the y-axis data.
     - z_key (str): The key for the z-axis data.
     - c_key (str): The key for the color data.
-    - **kwargs: Additional keyword arguments for customization.
+    - **kwargs: Additional keyword arguments for customization, set
+        `typed_array` to encode the arrays as Plotly typed arrays, and
+        `c_groups` to reuse the categories from `get_category_groups`.
 
     Returns:
     - list: The 3D scatter plot data.
@@ -145,6 +520,13 @@ def get_scatter3d_data(data_frame, x_key, y_key, z_key, c_key, **kwargs):
     c_type = kwargs.get("c_type", "numerical")
     opacity = kwargs.get("opacity", 0.8)
     showlegend = kwargs.get("showlegend", True)
+    typed_array = kwargs.get("typed_array", False)
+
+    def to_array(values, dtype="f4"):
+        # float32 coordinates and int32 ids, encoded as Plotly typed arrays
+        if typed_array:
+            return get_typed_array(values, dtype)
+        return values
 
     linewidth = 0
 
@@ -157,10 +539,10 @@ def get_scatter3d_data(data_frame, x_key, y_key, z_key, c_key, **kwargs):
         fig_data = [
             dict(
                 type="scatter3d",
-                ids=data_frame.index,
-                x=data_frame[x_key],
-                y=data_frame[y_key],
-                z=data_frame[z_key],
+                ids=to_array(data_frame.index, "i4"),
+                x=to_array(data_frame[x_key]),
+                y=to_array(data_frame[y_key]),
+                z=to_array(data_frame[z_key]),
                 #  text=hover_str,
                 #  hovertemplate=hovertemplate,
                 mode="markers",
@@ -168,7 +550,7 @@ def get_scatter3d_data(data_frame, x_key, y_key, z_key, c_key, **kwargs):
                 showlegend=showlegend,
                 marker=dict(
                     size=3,
-                    color=color,
+                    color=to_array(color),
                     opacity=opacity,
                     colorbar=dict(title=c_label),
                     cmin=c_range[0],
@@ -179,18 +561,23 @@ def get_scatter3d_data(data_frame, x_key, y_key, z_key, c_key, **kwargs):
         ]
     elif c_type == "categorical":
         fig_data = []
-        color_list = pd.unique(data_frame[c_key])
-
-        for c_item in color_list:
-            new_list = data_frame[data_frame[c_key] == c_item]
+        c_groups = kwargs.get("c_groups", None)
+        if c_groups is None:
+            c_groups = get_category_groups(data_frame[c_key])
 
+        # split the columns by the row positions instead of a mask per category
+        ids = data_frame.index.to_numpy()
+        x_data = data_frame[x_key].to_numpy()
+        y_data = data_frame[y_key].to_numpy()
+        z_data = data_frame[z_key].to_numpy()
+        for c_item, rows in zip(*c_groups):
             fig_data.append(
                 dict(
                     type="scatter3d",
-                    ids=new_list.index,
-                    x=new_list[x_key],
-                    y=new_list[y_key],
-                    z=new_list[z_key],
+                    ids=to_array(ids[rows], "i4"),
+                    x=to_array(x_data[rows]),
+                    y=to_array(y_data[rows]),
+                    z=to_array(z_data[rows]),
                     # text=hover_str,
                     # hovertemplate='%{text}',
                     mode="markers",
@@ -256,3 +643,457 @@ def get_ref_scatter3d_data(
     )
 
     return fig_data
+
+
+def get_raster_data(
+    data_frame, x_key, y_key, c_key, size, x_range=None, y_range=None, **kwargs
+):
+    """
+    Rasterize a 2D scatter plot into a heatmap of a fixed size.
+
+    The points are binned into pixels, and every pixel shows the mean of
+    the color data, or the number of points for categorical color data.
+    The size of the heatmap doesn't depend on the number of points.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - x_key (str): The key for the x-axis data.
+    - y_key (str): The key for the y-axis data.
+    - c_key (str): The key for the color data.
+    - size (tuple): The number of pixels in x and y.
+    - x_range (list, optional): The range of the x-axis. Defaults to the
+        range of the data.
+    - y_range (list, optional): The range of the y-axis. Defaults to the
+        range of the data.
+    - **kwargs: Additional keyword arguments for customization.
+
+    Returns:
+    - dict: The heatmap data.
+    """
+    c_label = kwargs.get("c_label", c_key)
+    c_type = kwargs.get("c_type", "numerical")
+    colormap = kwargs.get("colormap", "Jet")
+
+    x_data = data_frame[x_key].to_numpy(dtype=np.float64, na_value=np.nan)
+    y_data = data_frame[y_key].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = np.isfinite(x_data) & np.isfinite(y_data)
+
+    axes = []
+    for data, data_range, bins in (
+        (x_data, x_range, size[0]),
+        (y_data, y_range, size[1]),
+    ):
+        if data_range is None:
+            if np.any(valid):
+                data_range = [np.min(data[valid]), np.max(data[valid])]
+            else:
+                data_range = [0, 1]
+        else:
+            valid &= (data >= data_range[0]) & (data <= data_range[1])
+
+        step = (data_range[1] - data_range[0]) / bins
+        if step <= 0:
+            step = 1 / bins
+        axes.append((data_range[0], step, bins))
+
+    if c_type == "numerical":
+        c_data = data_frame[c_key].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid &= np.isfinite(c_data)
+
+    pixel = np.zeros(np.count_nonzero(valid), dtype=np.int64)
+    for data, (low, step, bins) in zip((y_data, x_data), axes[::-1]):
+        data_bin = np.clip(((data[valid] - low) / step).astype(np.int64), 0, bins - 1)
+        pixel = pixel * bins + data_bin
+
+    num_pixels = size[0] * size[1]
+    count = np.bincount(pixel, minlength=num_pixels)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if c_type == "numerical":
+            z_data = np.bincount(pixel, weights=c_data[valid], minlength=num_pixels)
+            z_data = z_data / count
+            z_title = c_label
+        else:
+            z_data = np.where(count > 0, count, np.nan)
+            z_title = "Count"
+
+    x_center = axes[0][0] + (np.arange(size[0]) + 0.5) * axes[0][1]
+    y_center = axes[1][0] + (np.arange(size[1]) + 0.5) * axes[1][1]
+
+    return {
+        "type": "heatmap",
+        "x": get_typed_array(x_center, "f8"),
+        "y": get_typed_array(y_center, "f8"),
+        "z": get_typed_array(z_data.reshape(size[1], size[0]), "f4"),
+        "colorscale": colormap,
+        "colorbar": {"title": z_title},
+        "hoverongaps": False,
+    }
+
+
+def get_histogram_bins(values, exponent=0.4, max_bins=1000):
+    """
+    Choose the bins of a histogram, with the same rule as the automatic
+    binning of Plotly.
+
+    The bin size is about twice the standard deviation over
+    `n ** exponent`, but not smaller than the smallest step between the
+    values, and is rounded up to 1, 2 or 5 times a power of ten.
+
+    Parameters:
+    - values (np.ndarray): The finite values to bin.
+    - exponent (float, optional): 0.4 for 1D and 0.25 for 2D histograms.
+        Defaults to 0.4.
+    - max_bins (int, optional): The maximum number of bins. Defaults to 1000.
+
+    Returns:
+    - tuple: The start of the first bin, the bin size and the number of bins.
+    """
+    if len(values) == 0:
+        return 0, 1, 1
+
+    low = np.min(values)
+    high = np.max(values)
+    # the smallest step is estimated on at most a million values
+    distinct = np.unique(values[:: max(len(values) // 1000000, 1)])
+    if len(distinct) > 1:
+        min_diff = np.min(np.diff(distinct))
+    else:
+        min_diff = 1
+
+    size = max(
+        min_diff,
+        2 * np.std(values) / len(values) ** exponent,
+        (high - low) / max_bins,
+    )
+    if not np.isfinite(size) or size <= 0:
+        size = 1
+
+    base = 10 ** np.floor(np.log10(size))
+    for step in (1, 2, 5, 10):
+        if step * base >= size * (1 - 1e-9):
+            size = step * base
+            break
+
+    start = np.floor(low / size) * size
+    num_bins = max(int(np.floor((high - start) / size)) + 1, 1)
+
+    return start, size, num_bins
+
+
+def get_bin_codes(column, key_type="numerical", unique_bins=False, exponent=0.4):
+    """
+    Assign the values of a column to histogram bins.
+
+    Parameters:
+    - column (pd.Series): The column to bin.
+    - key_type (str, optional): `categorical` for one bin per category.
+        Defaults to `numerical`.
+    - unique_bins (bool, optional): Use one bin per distinct value of a
+        numerical column. Defaults to False.
+    - exponent (float, optional): See `get_histogram_bins`. Defaults to 0.4.
+
+    Returns:
+    - tuple: The bin of every value (np.ndarray, -1 for missing values),
+        the positions of the bins and the bin size.
+    """
+    if key_type == "categorical":
+        codes, uniques = pd.factorize(column)
+        return codes, [str(val) for val in uniques], 1
+
+    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = np.isfinite(values)
+    if unique_bins:
+        uniques = np.unique(values[finite])
+        codes = np.searchsorted(uniques, values)
+        size = np.min(np.diff(uniques)) if len(uniques) > 1 else 1
+        positions = uniques
+    else:
+        start, size, num_bins = get_histogram_bins(values[finite], exponent)
+        with np.errstate(invalid="ignore"):
+            codes = np.floor((values - start) / size)
+        codes = np.clip(np.nan_to_num(codes), 0, num_bins - 1).astype(np.int64)
+        positions = start + (np.arange(num_bins) + 0.5) * size
+
+    return np.where(finite, codes, -1), positions, size
+
+
+def get_histogram_data(data_frame, x_key, c_key=None, histnorm="", **kwargs):
+    """
+    Bin a histogram on the server, and generate a bar trace per color.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - x_key (str): The key for the x-axis data.
+    - c_key (str, optional): The key for the color data. Defaults to None.
+    - histnorm (str, optional): The normalization of the counts, empty,
+        `probability` or `density`. Defaults to empty.
+    - **kwargs: Additional keyword arguments for customization, set
+        `x_type` to `categorical` to count the categories of the x-axis
+        data, and `unique_bins` to use one bin per distinct value.
+
+    Returns:
+    - list: The bar traces.
+    """
+    codes, positions, size = get_bin_codes(
+        data_frame[x_key],
+        kwargs.get("x_type", "numerical"),
+        kwargs.get("unique_bins", False),
+    )
+    num_bins = len(positions)
+    if isinstance(positions, list):
+        x_data = positions
+    else:
+        x_data = get_typed_array(positions, "f8")
+
+    if c_key is None:
+        groups = [(None, np.flatnonzero(codes >= 0))]
+    else:
+        c_groups = get_category_groups(data_frame[c_key])
+        groups = [(c_item, rows[codes[rows] >= 0]) for c_item, rows in zip(*c_groups)]
+
+    fig_data = []
+    for c_item, rows in groups:
+        counts = np.bincount(codes[rows], minlength=num_bins).astype(np.float64)
+        if histnorm == "probability" and len(rows) > 0:
+            counts /= len(rows)
+        elif histnorm == "density":
+            counts /= size
+
+        trace = {
+            "type": "bar",
+            "x": x_data,
+            "y": get_typed_array(counts, "f8"),
+            "opacity": 1,
+        }
+        if c_item is not None:
+            trace["name"] = str(c_item)
+            trace["legendgroup"] = str(c_item)
+        fig_data.append(trace)
+
+    return fig_data
+
+
+def get_histogram2d_data(data_frame, x_key, y_key, **kwargs):
+    """
+    Bin a 2D histogram on the server, and generate a contour trace of the
+    counts.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - x_key (str): The key for the x-axis data.
+    - y_key (str): The key for the y-axis data.
+    - **kwargs: Additional keyword arguments for customization, set
+        `x_type` and `y_type` to `categorical` to count the categories.
+
+    Returns:
+    - dict: The contour trace.
+    """
+    x_codes, x_positions, _ = get_bin_codes(
+        data_frame[x_key], kwargs.get("x_type", "numerical"), exponent=0.25
+    )
+    y_codes, y_positions, _ = get_bin_codes(
+        data_frame[y_key], kwargs.get("y_type", "numerical"), exponent=0.25
+    )
+
+    valid = (x_codes >= 0) & (y_codes >= 0)
+    num_x = len(x_positions)
+    num_y = len(y_positions)
+    counts = np.bincount(
+        y_codes[valid] * num_x + x_codes[valid], minlength=num_x * num_y
+    )
+
+    fig_data = {
+        "type": "contour",
+        "z": get_typed_array(counts.reshape(num_y, num_x), "f8"),
+        "colorscale": "Jet",
+    }
+    for axis, positions in (("x", x_positions), ("y", y_positions)):
+        if isinstance(positions, list):
+            fig_data[axis] = positions
+        else:
+            fig_data[axis] = get_typed_array(positions, "f8")
+
+    return fig_data
+
+
+def get_violin_stats(values, group, num_groups, grid_size=512):
+    """
+    Compute the kernel density and the box statistics of every group in
+    one pass.
+
+    The values of every group are binned on a grid between their minimum
+    and maximum, and the binned counts are smoothed with a Gaussian kernel
+    in the frequency domain. The bandwidth follows Silverman's rule, the
+    same as Plotly, and the quartiles are interpolated from the bins.
+
+    Parameters:
+    - values (np.ndarray): The finite values.
+    - group (np.ndarray): The group of every value.
+    - num_groups (int): The number of groups.
+    - grid_size (int, optional): The number of grid points. Defaults to 512.
+
+    Returns:
+    - dict: The statistics of every group (np.ndarray), `count`, `min`,
+        `max`, `mean`, `q1`, `median`, `q3`, `lowerfence`, `upperfence`,
+        and `grid` and `density` of shape (groups, grid_size).
+    """
+    count = np.bincount(group, minlength=num_groups)
+    safe_count = np.maximum(count, 1)
+    mean = np.bincount(group, weights=values, minlength=num_groups) / safe_count
+    square = np.bincount(group, weights=values**2, minlength=num_groups)
+    std = np.sqrt(np.maximum(square / safe_count - mean**2, 0))
+
+    low = np.full(num_groups, np.inf)
+    high = np.full(num_groups, -np.inf)
+    np.minimum.at(low, group, values)
+    np.maximum.at(high, group, values)
+    low[count == 0] = 0
+    high[count == 0] = 0
+
+    # a group with a single value has no spread, its values are binned with
+    # a unit step, and its grid stays at the value, a flat outline
+    degenerate = high <= low
+    step = (high - low) / grid_size
+    step[degenerate] = 1
+    cell = np.clip(
+        ((values - low[group]) / step[group]).astype(np.int64), 0, grid_size - 1
+    )
+    bins = np.bincount(
+        group * grid_size + cell, minlength=num_groups * grid_size
+    ).reshape(num_groups, grid_size)
+
+    # quartiles interpolated inside the bins of the cumulative counts
+    cumulative = np.cumsum(bins, axis=1)
+    stats = {}
+    for name, quantile in (("q1", 0.25), ("median", 0.5), ("q3", 0.75)):
+        target = quantile * count
+        index = np.minimum(np.sum(cumulative < target[:, None], axis=1), grid_size - 1)
+        rows = np.arange(num_groups)
+        before = cumulative[rows, index] - bins[rows, index]
+        fraction = (target - before) / np.maximum(bins[rows, index], 1)
+        stats[name] = np.clip(low + (index + fraction) * step, low, high)
+
+    iqr = stats["q3"] - stats["q1"]
+    stats["lowerfence"] = np.maximum(stats["q1"] - 1.5 * iqr, low)
+    stats["upperfence"] = np.minimum(stats["q3"] + 1.5 * iqr, high)
+
+    # Silverman's rule, in units of bins
+    spread = np.where(iqr > 0, np.minimum(std, iqr / 1.349), std)
+    bandwidth = 1.059 * spread * safe_count ** (-0.2)
+    sigma = np.maximum(bandwidth / step, 0.5)
+
+    # convolve with the Gaussian kernel of every group at once, zero padded
+    frequency = np.fft.rfftfreq(2 * grid_size)
+    kernel = np.exp(-2 * (np.pi * sigma[:, None] * frequency[None, :]) ** 2)
+    density = np.fft.irfft(np.fft.rfft(bins, n=2 * grid_size, axis=1) * kernel, axis=1)
+    density = np.maximum(density[:, :grid_size], 0)
+
+    stats.update(
+        {
+            "count": count,
+            "min": low,
+            "max": high,
+            "mean": mean,
+            "grid": low[:, None]
+            + (np.arange(grid_size)[None, :] + 0.5)
+            * np.where(degenerate, 0, step)[:, None],
+            "density": density,
+        }
+    )
+    return stats
+
+
+def get_violin_data(data_frame, x_key, y_key, c_key=None, **kwargs):
+    """
+    Generate violins from server-side statistics, see `get_violin_stats`.
+
+    Every violin is a filled outline of its kernel density with a box of
+    its precomputed quartiles, so only the outlines are sent instead of
+    the samples. The categories of `x_key` are placed at 0, 1, 2, ... and
+    the colors are grouped side by side.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - x_key (str): The key for the categories on the x-axis.
+    - y_key (str): The key for the values on the y-axis.
+    - c_key (str, optional): The key for the color data. Defaults to None.
+    - **kwargs: Additional keyword arguments for customization, `colors`
+        is the list of colors of the groups.
+
+    Returns:
+    - tuple: The violin traces, and the categories on the x-axis.
+    """
+    colors = kwargs.get("colors", ["#636efa"])
+
+    values = data_frame[y_key].to_numpy(dtype=np.float64, na_value=np.nan)
+    x_codes, x_uniques = pd.factorize(data_frame[x_key])
+    if c_key is None:
+        c_codes = np.zeros(len(values), dtype=np.int64)
+        c_uniques = [None]
+    else:
+        c_codes, c_uniques = pd.factorize(data_frame[c_key])
+
+    # an empty figure when every row has been filtered out
+    num_c = len(c_uniques)
+    if num_c == 0 or len(x_uniques) == 0:
+        return [], []
+
+    # group by the category and the color in a single pass
+    valid = np.isfinite(values) & (x_codes >= 0) & (c_codes >= 0)
+    group = x_codes[valid] * num_c + c_codes[valid]
+    stats = get_violin_stats(values[valid], group, len(x_uniques) * num_c)
+
+    slot = 0.8 / num_c
+    fig_data = []
+    for c_idx, c_item in enumerate(c_uniques):
+        color = colors[c_idx % len(colors)]
+        showlegend = c_item is not None
+        for x_idx in range(len(x_uniques)):
+            g_idx = x_idx * num_c + c_idx
+            if stats["count"][g_idx] == 0:
+                continue
+
+            name = str(x_uniques[x_idx]) if c_item is None else str(c_item)
+
+            center = x_idx - 0.4 + (c_idx + 0.5) * slot
+            half_width = stats["density"][g_idx] / np.max(stats["density"][g_idx])
+            half_width = half_width * slot * 0.45
+            grid = stats["grid"][g_idx]
+
+            fig_data.append(
+                {
+                    "type": "scatter",
+                    "x": get_typed_array(
+                        np.r_[center + half_width, center - half_width[::-1]]
+                    ),
+                    "y": get_typed_array(np.r_[grid, grid[::-1]]),
+                    "mode": "lines",
+                    "fill": "toself",
+                    "line": {"color": color, "width": 1},
+                    "hoverinfo": "skip",
+                    "name": name,
+                    "legendgroup": name,
+                    "showlegend": showlegend,
+                }
+            )
+            fig_data.append(
+                {
+                    "type": "box",
+                    "x": [center],
+                    "q1": [stats["q1"][g_idx]],
+                    "median": [stats["median"][g_idx]],
+                    "q3": [stats["q3"][g_idx]],
+                    "lowerfence": [stats["lowerfence"][g_idx]],
+                    "upperfence": [stats["upperfence"][g_idx]],
+                    "mean": [stats["mean"][g_idx]],
+                    "width": slot * 0.15,
+                    "marker": {"color": color},
+                    "line": {"width": 1},
+                    "name": name,
+                    "legendgroup": name,
+                    "showlegend": False,
+                }
+            )
+            showlegend = False
+
+    return fig_data, [str(val) for val in x_uniques]
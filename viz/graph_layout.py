@@ -29,7 +29,34 @@
 
 import numpy as np
 
-import plotly.io as pio
+
+def get_scatter3d_images(image):
+    """
+    Generate the `images` of the 3D scatter plot layout, the picture of the
+    frame at the top left corner.
+
+    Parameters:
+    - image (str): The encoded image, or None.
+
+    Returns:
+    - list: The layout images, or None if there is no image.
+    """
+    if image is None:
+        return None
+
+    return [
+        dict(
+            source=image,
+            xref="x domain",
+            yref="y domain",
+            x=0,
+            y=1,
+            xanchor="left",
+            yanchor="top",
+            sizex=0.3,
+            sizey=0.3,
+        )
+    ]
 
 
 def get_scatter3d_layout(x_range, y_range, z_range=[-20, 20], **kwargs):
@@ -43,7 +70,8 @@ def get_scatter3d_layout(x_range, y_range, z_range=[-20, 20], **kwargs):
     - **kwargs: Additional keyword arguments for customization.
 
     Returns:
-    - dict: The layout for the 3D scatter plot.
+    - dict: The layout for the 3D scatter plot. The template is referenced
+        by name, it is resolved when the figure is sent to the browser.
     """
     scale = np.min(
         [x_range[1] - x_range[0], y_range[1] - y_range[0], z_range[1] - z_range[0]]
@@ -58,26 +86,9 @@ def get_scatter3d_layout(x_range, y_range, z_range=[-20, 20], **kwargs):
     y_label = kwargs.get("y_label", None)
     z_label = kwargs.get("z_label", None)
 
-    if image is not None:
-        img_dict = [
-            dict(
-                source=image,
-                xref="x domain",
-                yref="y domain",
-                x=0,
-                y=1,
-                xanchor="left",
-                yanchor="top",
-                sizex=0.3,
-                sizey=0.3,
-            )
-        ]
-    else:
-        img_dict = None
-
     return dict(
         title=title,
-        template=pio.templates[template],
+        template=template,
         # height=height,
         scene=dict(
             xaxis=dict(range=x_range, title=x_label, autorange=False),
@@ -92,6 +103,6 @@ def get_scatter3d_layout(x_range, y_range, z_range=[-20, 20], **kwargs):
         ),
         margin=dict(l=0, r=0, b=0, t=40),
         legend=dict(x=0, y=0),
-        images=img_dict,
+        images=get_scatter3d_images(image),
         uirevision="no_change",
     )
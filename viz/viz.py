@@ -30,12 +30,15 @@
 import base64
 
 import numpy as np
-import pandas as pd
+
+from plotly.colors import qualitative
 
 from .graph_data import get_scatter3d_data, get_ref_scatter3d_data
+from .graph_data import get_raster_data, get_histogram_data
+from .graph_data import get_histogram2d_data, get_violin_data
 from .graph_layout import get_scatter3d_layout
 
-from .graph_data import get_hover_strings
+from .graph_data import get_hover_strings, get_category_groups
 
 
 def get_scatter3d(
@@ -76,9 +79,10 @@ def get_scatter3d(
     return {"data": data, "layout": get_scatter3d_layout(**kwargs)}
 
 
-def get_heatmap(data_frame, x_key, y_key, x_label=None, y_label=None):
+def get_heatmap(data_frame, x_key, y_key, x_label=None, y_label=None, **kwargs):
     """
-    Generate the heatmap plot data and layout.
+    Generate the heatmap plot data and layout, binned on the server, see
+    `get_histogram2d_data`.
 
     Parameters:
     - data_frame (pd.DataFrame): The data frame containing the data.
@@ -86,6 +90,7 @@ def get_heatmap(data_frame, x_key, y_key, x_label=None, y_label=None):
     - y_key (str): The key for the y-axis data.
     - x_label (str): The label for the x-axis.
     - y_label (str): The label for the y-axis.
+    - **kwargs: Additional keyword arguments for customization.
 
     Returns:
     - dict: The heatmap plot data and layout.
@@ -97,14 +102,7 @@ def get_heatmap(data_frame, x_key, y_key, x_label=None, y_label=None):
         y_label = y_key
 
     return {
-        "data": [
-            {
-                "type": "histogram2dcontour",
-                "x": data_frame[x_key],
-                "y": data_frame[y_key],
-                "colorscale": "Jet",
-            }
-        ],
+        "data": [get_histogram2d_data(data_frame, x_key, y_key, **kwargs)],
         "layout": {
             "xaxis": {"title": x_label},
             "yaxis": {"title": y_label},
@@ -112,6 +110,92 @@ def get_heatmap(data_frame, x_key, y_key, x_label=None, y_label=None):
     }
 
 
+def get_histogram(
+    data_frame, x_key, c_key=None, histnorm="", x_label=None, y_label=None, **kwargs
+):
+    """
+    Generate the histogram plot data and layout, binned on the server, see
+    `get_histogram_data`.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - x_key (str): The key for the x-axis data.
+    - c_key (str): The key for the color data.
+    - histnorm (str): The normalization of the counts.
+    - x_label (str): The label for the x-axis.
+    - y_label (str): The label for the y-axis.
+    - **kwargs: Additional keyword arguments for customization.
+
+    Returns:
+    - dict: The histogram plot data and layout.
+    """
+    if x_label is None:
+        x_label = x_key
+
+    layout = {
+        "barmode": "group",
+        "bargap": 0,
+        "xaxis": {"title": x_label},
+        "yaxis": {"title": y_label},
+        "margin": {"t": 60},
+    }
+    if kwargs.get("x_type", "numerical") == "categorical":
+        layout["xaxis"]["type"] = "category"
+        layout["bargap"] = 0.2
+    if c_key is not None:
+        layout["legend"] = {"title": c_key}
+
+    return {
+        "data": get_histogram_data(data_frame, x_key, c_key, histnorm, **kwargs),
+        "layout": layout,
+    }
+
+
+def get_violin(
+    data_frame, x_key, y_key, c_key=None, x_label=None, y_label=None, **kwargs
+):
+    """
+    Generate the violin plot data and layout, computed on the server, see
+    `get_violin_data`.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - x_key (str): The key for the categories on the x-axis.
+    - y_key (str): The key for the values on the y-axis.
+    - c_key (str): The key for the color data.
+    - x_label (str): The label for the x-axis.
+    - y_label (str): The label for the y-axis.
+    - **kwargs: Additional keyword arguments for customization.
+
+    Returns:
+    - dict: The violin plot data and layout.
+    """
+    if x_label is None:
+        x_label = x_key
+
+    if y_label is None:
+        y_label = y_key
+
+    data, categories = get_violin_data(
+        data_frame, x_key, y_key, c_key, colors=qualitative.Plotly, **kwargs
+    )
+
+    layout = {
+        "xaxis": {
+            "title": x_label,
+            "tickmode": "array",
+            "tickvals": list(range(len(categories))),
+            "ticktext": categories,
+        },
+        "yaxis": {"title": y_label},
+        "margin": {"t": 60},
+    }
+    if c_key is not None:
+        layout["legend"] = {"title": c_key}
+
+    return {"data": data, "layout": layout}
+
+
 def get_scatter2d(
     data_frame,
     x_key,
@@ -187,15 +271,16 @@ def get_scatter2d(
 
     if c_type == "categorical":
         data = []
-        color_list = pd.unique(data_frame[c_key])
-        for c_item in color_list:
-            new_list = data_frame[data_frame[c_key] == c_item]
+        ids = data_frame.index.to_numpy()
+        x_data = data_frame[x_key].to_numpy()
+        y_data = data_frame[y_key].to_numpy()
+        for c_item, rows in zip(*get_category_groups(data_frame[c_key])):
             data.append(
                 {
                     "type": "scattergl",
-                    "ids": new_list.index,
-                    "x": new_list[x_key],
-                    "y": new_list[y_key],
+                    "ids": ids[rows],
+                    "x": x_data[rows],
+                    "y": y_data[rows],
                     "mode": "markers",
                     "marker": {
                         "size": 6,
@@ -219,6 +304,66 @@ def get_scatter2d(
         }
 
 
+def get_scatter2d_raster(
+    data_frame,
+    x_key,
+    y_key,
+    c_key,
+    x_label=None,
+    y_label=None,
+    uirevision="no_change",
+    colormap="Jet",
+    margin={"l": 40, "r": 40, "b": 40, "t": 60},
+    **kwargs
+):
+    """
+    Generate the rasterized 2D scatter plot data and layout, see
+    `get_raster_data`.
+
+    Parameters:
+    - data_frame (pd.DataFrame): The data frame containing the data.
+    - x_key (str): The key for the x-axis data.
+    - y_key (str): The key for the y-axis data.
+    - c_key (str): The key for the color data.
+    - x_label (str): The label for the x-axis.
+    - y_label (str): The label for the y-axis.
+    - uirevision (str): The revision id for updating the plot.
+    - colormap (str): The name of the colormap for the color data.
+    - margin (dict): The margin settings for the plot.
+    - **kwargs: Additional keyword arguments for customization, `size` is
+        the number of pixels in x and y, `x_range` and `y_range` are the
+        rasterized ranges.
+
+    Returns:
+    - dict: The rasterized 2D scatter plot data and layout.
+    """
+    if x_label is None:
+        x_label = x_key
+
+    if y_label is None:
+        y_label = y_key
+
+    return {
+        "data": [
+            get_raster_data(
+                data_frame,
+                x_key,
+                y_key,
+                c_key,
+                kwargs.pop("size", (640, 480)),
+                colormap=colormap,
+                **kwargs
+            )
+        ],
+        "layout": {
+            "xaxis": {"title": x_label},
+            "yaxis": {"title": y_label},
+            "margin": margin,
+            "uirevision": uirevision,
+        },
+    }
+
+
 def frame_args(duration):
     """
     Generate the frame arguments for animation.